@@ -24,19 +24,29 @@ Features:
 from __future__ import annotations
 
 import argparse
+import atexit
+import codecs
+import collections
+import copy
 import dataclasses
+import functools
+import hashlib
+import itertools
 import json
 import os
 import queue
 import re
+import selectors
 import shlex
 import shutil
+import signal
 import subprocess
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 from urllib import error as urlerror
 from urllib import request as urlrequest
 from urllib.parse import quote
@@ -51,6 +61,7 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "branch": "dev",
     "working_root": "./runtime",
     "loop_interval_seconds": 3600,
+    "refresh_min_interval_seconds": 300,
     "report_min_pass_rate": 90.0,
     "require_code_changes": False,
     "require_non_doc_code_changes": False,
@@ -175,6 +186,69 @@ CLI_ALIAS_MAP: Dict[str, str] = {
     "claude_code": "Claude Code CLI",
 }
 
+_NUM_RE = re.compile(r"\d+")
+_WS_RE = re.compile(r"\s+")
+_PROGRESS_RES = [
+    re.compile(p)
+    for p in (
+        r"\b\d{1,3}%\b",
+        r"eta",
+        r"remaining",
+        r"预计",
+        r"还需",
+        r"分钟",
+        r"min",
+        r"完成了",
+        r"progress",
+    )
+]
+CLI_OUTPUT_KEEP_LINES = 2000
+CLI_OUTPUT_TAIL_LINES = 20
+
+_NEWLINE_RE = re.compile(r"\r\n|\r|\n")
+_CODEX_SESSION_RE = re.compile(r"session id:\s*([0-9a-fA-F-]{36})")
+_SUMMARY_RE = re.compile(r"(\d+)\s+(passed|failed)")
+_SUMMARY_TAIL_CHARS = 4096
+_RATE_RE = re.compile(r"(\d+(?:\.\d+)?)")
+
+
+def compile_keyword_pattern(keywords: List[str]) -> Optional["re.Pattern[str]"]:
+    """One case-insensitive alternation over all literals so each line is scanned once, unlowered."""
+    literals = [k for k in keywords if k]
+    if not literals:
+        return None
+    return re.compile("|".join(re.escape(k) for k in literals), re.IGNORECASE)
+
+
+_OPERATION_RE = compile_keyword_pattern(
+    [
+        "test",
+        "testing",
+        "run",
+        "running",
+        "build",
+        "generate",
+        "fix",
+        "optimi",
+        "重构",
+        "优化",
+        "测试",
+        "生成",
+        "运行",
+    ]
+)
+_CONFIRM_RE = compile_keyword_pattern(["是否", "确认", "继续", "proceed", "confirm", "y/n", "yes/no"])
+
+# One shared encoder for JSONL records: json.dumps() builds a new encoder per call when
+# given non-default options, and compact separators keep the log lines smaller.
+_JSONL_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+_UTC = timezone.utc
+
+
+def utc_now_iso() -> str:
+    """Second-resolution UTC timestamp for summaries and marker files."""
+    return datetime.now(_UTC).isoformat(timespec="seconds")
+
 
 @dataclasses.dataclass
 class CLIConfig:
@@ -186,6 +260,14 @@ class CLIConfig:
     send_prompt_via_stdin: bool = False
     enabled: bool = True
 
+    @functools.cached_property
+    def argv(self) -> Optional[Tuple[str, ...]]:
+        """`command` split shell-style once per tool; None if it cannot be parsed."""
+        try:
+            return tuple(shlex.split(self.command))
+        except ValueError:
+            return None
+
 
 @dataclasses.dataclass
 class Timeouts:
@@ -237,6 +319,16 @@ class RuntimeConfig:
     cli_tools: List[CLIConfig]
     git_identity_name: str
     git_identity_email: str
+    error_keyword_pattern: Optional["re.Pattern[str]"] = None
+    # Within this many seconds of the last fetch, a cheap ls-remote decides whether to fetch again.
+    refresh_min_interval_seconds: int = 300
+    # Deduped pathspecs unstaged before every commit; built once in load_config.
+    never_commit_pathspecs: Tuple[str, ...] = ()
+    # Set when the configured commit template failed validation and the default replaced it.
+    rejected_commit_template: Optional[str] = None
+    commit_template_error: Optional[str] = None
+    # Redo reason for the substantive-change gate; the thresholds are fixed for the run.
+    threshold_redo_reason: str = ""
 
 
 @dataclasses.dataclass
@@ -250,6 +342,9 @@ class CLIExecutionResult:
     saw_error_keyword: Optional[str]
     loop_detected: bool
     progress_probe_sent: bool
+    codex_session_id: Optional[str] = None
+    # Last few lines, sliced once for the finish/remediation log events.
+    output_tail: List[str] = dataclasses.field(default_factory=list)
 
 
 @dataclasses.dataclass
@@ -261,6 +356,10 @@ class AuditResult:
     reason: str
 
 
+# AuditResult holds only primitives, so a shallow field map replaces dataclasses.asdict's deep copy.
+_AUDIT_FIELDS = tuple(f.name for f in dataclasses.fields(AuditResult))
+
+
 @dataclasses.dataclass
 class RoundResult:
     status: str
@@ -272,17 +371,71 @@ class RoundResult:
     message: str
 
 
+def _paused_result(
+    round_id: int,
+    tool_name: Optional[str],
+    msg: str,
+    commit_status: str = "not_started",
+    commit_hash: Optional[str] = None,
+    audit: Optional[AuditResult] = None,
+) -> RoundResult:
+    return RoundResult(
+        status="paused",
+        round_id=round_id,
+        tool_used=tool_name,
+        audit_result=audit,
+        commit_status=commit_status,
+        commit_hash=commit_hash,
+        message=msg,
+    )
+
+
+def _success_result(
+    round_id: int,
+    tool_name: str,
+    msg: str,
+    commit_status: str,
+    commit_hash: Optional[str],
+    audit: AuditResult,
+) -> RoundResult:
+    return RoundResult(
+        status="success",
+        round_id=round_id,
+        tool_used=tool_name,
+        audit_result=audit,
+        commit_status=commit_status,
+        commit_hash=commit_hash,
+        message=msg,
+    )
+
+
 class EventLogger:
+    FLUSH_EVERY_RECORDS = 64
+    FLUSH_IDLE_SECONDS = 0.25
+
     def __init__(self, path: Path, secret_mask: Optional[str] = None) -> None:
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self.secret_mask = secret_mask or ""
+        self._mask: Optional[str] = self.secret_mask or None
+        self._quoted_mask: Optional[str] = quote(self.secret_mask) if self.secret_mask else None
+        # Opened on the caller thread so permission errors still surface here.
+        self._fh = self.path.open("a", encoding="utf-8", buffering=1 << 16)
+        self._q: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._closed = False
+        # Serializes the _closed check + enqueue against close() putting the sentinel.
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._drain, name="openclaw-event-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
 
     def _sanitize(self, value: Any) -> Any:
         if isinstance(value, str):
-            if self.secret_mask:
-                value = value.replace(self.secret_mask, "***")
-                value = value.replace(quote(self.secret_mask), "***")
+            mask = self._mask
+            quoted = self._quoted_mask
+            # `in` is a cheap miss; only pay for replace() when a secret is present.
+            if mask and quoted and (mask in value or quoted in value):
+                value = value.replace(mask, "***").replace(quoted, "***")
             return value
         if isinstance(value, list):
             return [self._sanitize(v) for v in value]
@@ -290,32 +443,102 @@ class EventLogger:
             return {k: self._sanitize(v) for k, v in value.items()}
         return value
 
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> str:
+        record["ts"] = datetime.fromtimestamp(record["ts"], _UTC).isoformat()
+        return _JSONL_ENCODER.encode(record) + "\n"
+
+    def _drain(self) -> None:
+        pending = 0
+        while True:
+            try:
+                line = self._q.get(timeout=self.FLUSH_IDLE_SECONDS)
+            except queue.Empty:
+                if pending:
+                    self._fh.flush()
+                    pending = 0
+                continue
+            if line is None:
+                self._fh.flush()
+                return
+            self._fh.write(line)
+            pending += 1
+            if pending >= self.FLUSH_EVERY_RECORDS:
+                self._fh.flush()
+                pending = 0
+
     def log(self, event: str, **kwargs: Any) -> None:
         record = {
-            "ts": datetime.now(timezone.utc).isoformat(),
+            "ts": time.time(),
             "event": event,
             **kwargs,
         }
-        clean = self._sanitize(record)
-        with self.path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(clean, ensure_ascii=False) + "\n")
+        # Sanitize and encode on the caller: queued lines never hold the raw secret, and
+        # later mutation of the caller's kwargs cannot change what gets written.
+        line = self._encode(self._sanitize(record) if self._mask else record)
+        with self._lock:
+            if self._closed:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(line)
+                return
+            self._q.put(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._q.put(None)
+        self._thread.join(timeout=10)
+        self._fh.close()
+
+
+# Snapshot taken at import so later mutation of DEFAULT_CONFIG cannot leak into loaded configs.
+_DEFAULT_CONFIG_FROZEN: Dict[str, Any] = copy.deepcopy(DEFAULT_CONFIG)
+
+
+def _fresh_default() -> Dict[str, Any]:
+    return copy.deepcopy(_DEFAULT_CONFIG_FROZEN)
+
+
+def deep_merge_inplace(dst: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    stack: List[Tuple[Dict[str, Any], Dict[str, Any]]] = [(dst, override)]
+    while stack:
+        target, src = stack.pop()
+        for k, v in src.items():
+            current = target.get(k)
+            if isinstance(v, dict) and isinstance(current, dict):
+                stack.append((current, v))
+            else:
+                target[k] = v
+    return dst
 
 
-def deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
-    out = dict(base)
-    for k, v in override.items():
-        if isinstance(v, dict) and isinstance(out.get(k), dict):
-            out[k] = deep_merge(out[k], v)
-        else:
-            out[k] = v
-    return out
+def validate_commit_template(template: str) -> Optional[str]:
+    """Return the formatting error for `template`, or None if it renders with the known fields."""
+    try:
+        template.format(project="project", core="core", rate="100", changes="M file")
+    except Exception as e:  # noqa: BLE001
+        return str(e) or type(e).__name__
+    return None
+
+
+def build_never_commit_pathspecs(prompt_path: str, report_path: str, extra: List[str]) -> Tuple[str, ...]:
+    paths = [
+        prompt_path,
+        report_path,
+        ".openclaw/openclaw_init_prompt.md",
+        ".openclaw/init_state",
+        *extra,
+    ]
+    return tuple(k for k in dict.fromkeys(str(rel).strip() for rel in paths) if k)
 
 
 def load_config(path: Path) -> RuntimeConfig:
     if not path.exists():
         path.write_text(json.dumps(DEFAULT_CONFIG, ensure_ascii=False, indent=2), encoding="utf-8")
     user_cfg = json.loads(path.read_text(encoding="utf-8"))
-    cfg = deep_merge(DEFAULT_CONFIG, user_cfg)
+    cfg = deep_merge_inplace(_fresh_default(), user_cfg)
 
     cli_tools = [CLIConfig(**item) for item in cfg["cli_tools"]]
     timeouts = Timeouts(**cfg["timeouts"])
@@ -326,6 +549,16 @@ def load_config(path: Path) -> RuntimeConfig:
     task_requirement = str(cfg.get("task_requirement", "")).strip()
     if not task_requirement:
         task_requirement = DEFAULT_CONFIG["task_requirement"]
+    error_keywords = [str(x).lower() for x in cfg["error_keywords"]]
+    never_commit_paths = [str(x) for x in cfg.get("never_commit_paths", []) if str(x).strip()]
+    min_files = max(0, int(cfg.get("minimum_non_doc_files_changed", 0)))
+    min_lines = max(0, int(cfg.get("minimum_non_doc_lines_changed", 0)))
+    commit_template = str(cfg["commit_message_template"])
+    commit_template_error = validate_commit_template(commit_template)
+    rejected_commit_template: Optional[str] = None
+    if commit_template_error is not None:
+        rejected_commit_template = commit_template
+        commit_template = DEFAULT_CONFIG["commit_message_template"]
     return RuntimeConfig(
         repo_url=cfg["repo_url"],
         project_name=project_name,
@@ -335,19 +568,20 @@ def load_config(path: Path) -> RuntimeConfig:
         branch=cfg["branch"],
         working_root=Path(cfg["working_root"]).resolve(),
         loop_interval_seconds=int(cfg["loop_interval_seconds"]),
+        refresh_min_interval_seconds=max(0, int(cfg.get("refresh_min_interval_seconds", 300))),
         report_min_pass_rate=float(cfg["report_min_pass_rate"]),
         require_code_changes=bool(cfg.get("require_code_changes", False)),
         require_non_doc_code_changes=bool(cfg.get("require_non_doc_code_changes", False)),
-        minimum_non_doc_files_changed=max(0, int(cfg.get("minimum_non_doc_files_changed", 0))),
-        minimum_non_doc_lines_changed=max(0, int(cfg.get("minimum_non_doc_lines_changed", 0))),
+        minimum_non_doc_files_changed=min_files,
+        minimum_non_doc_lines_changed=min_lines,
         max_audit_failures_per_cli=int(cfg["max_audit_failures_per_cli"]),
         log_dir=Path(cfg["log_dir"]).resolve(),
         report_path=cfg["report_path"],
         prompt_path=cfg["prompt_path"],
         preserve_untracked_paths=[str(x) for x in cfg.get("preserve_untracked_paths", []) if str(x).strip()],
-        never_commit_paths=[str(x) for x in cfg.get("never_commit_paths", []) if str(x).strip()],
-        commit_message_template=cfg["commit_message_template"],
-        error_keywords=[str(x).lower() for x in cfg["error_keywords"]],
+        never_commit_paths=never_commit_paths,
+        commit_message_template=commit_template,
+        error_keywords=error_keywords,
         timeouts=timeouts,
         init_enabled=bool(init_cfg.get("enabled", True)),
         init_force_reinit=bool(init_cfg.get("force_reinit", False)),
@@ -372,6 +606,14 @@ def load_config(path: Path) -> RuntimeConfig:
         cli_tools=cli_tools,
         git_identity_name=gi.get("name", "ai"),
         git_identity_email=gi.get("email", "ai@local"),
+        error_keyword_pattern=compile_keyword_pattern(error_keywords),
+        never_commit_pathspecs=build_never_commit_pathspecs(cfg["prompt_path"], cfg["report_path"], never_commit_paths),
+        rejected_commit_template=rejected_commit_template,
+        commit_template_error=commit_template_error,
+        threshold_redo_reason=(
+            "本轮代码改动幅度不足"
+            f"（minimum_non_doc_files_changed={min_files}, minimum_non_doc_lines_changed={min_lines}）"
+        ),
     )
 
 
@@ -386,14 +628,21 @@ def split_csv(raw: Optional[str]) -> List[str]:
     return [x.strip() for x in raw.split(",") if x.strip()]
 
 
+@functools.lru_cache(maxsize=8)
+def cli_name_resolver(available_names: Tuple[str, ...]) -> Dict[str, str]:
+    # Aliases win over configured names, matching the old alias-first lookup. Do not mutate.
+    resolver = {name.lower(): name for name in available_names}
+    resolver.update(CLI_ALIAS_MAP)
+    return resolver
+
+
 def resolve_cli_names(tokens: List[str], available_names: List[str]) -> Tuple[List[str], List[str]]:
-    by_lower = {name.lower(): name for name in available_names}
+    resolver = cli_name_resolver(tuple(available_names))
     resolved: List[str] = []
     unknown: List[str] = []
     seen: set[str] = set()
     for token in tokens:
-        key = token.strip().lower()
-        target = CLI_ALIAS_MAP.get(key) or by_lower.get(key)
+        target = resolver.get(token.strip().lower())
         if not target:
             unknown.append(token)
             continue
@@ -415,6 +664,7 @@ def run_cmd(
     args: List[str],
     cwd: Optional[Path] = None,
     timeout: int = 300,
+    close_fds: bool = True,
 ) -> Tuple[int, str]:
     try:
         proc = subprocess.run(
@@ -424,6 +674,7 @@ def run_cmd(
             stderr=subprocess.STDOUT,
             text=True,
             timeout=timeout,
+            close_fds=close_fds,
         )
         return proc.returncode, proc.stdout or ""
     except subprocess.TimeoutExpired as e:
@@ -439,7 +690,55 @@ def run_cmd(
         return 126, f"os_error:{e}"
 
 
+@functools.lru_cache(maxsize=1)
+def git_binary() -> str:
+    return shutil.which("git") or "git"
+
+
+def run_git(repo_dir: Path, *args: str, timeout: int = 300) -> Tuple[int, str]:
+    # An absolute executable, no cwd (-C instead) and close_fds=False let CPython
+    # launch via posix_spawn instead of fork+exec. Our own fds are non-inheritable (PEP 446).
+    return run_cmd(
+        [git_binary(), "-C", str(repo_dir), *args],
+        timeout=timeout,
+        close_fds=False,
+    )
+
+
+TOKEN_VERIFY_CACHE_SECONDS = 3600
+
+
+def _token_verify_cache_path(cfg: RuntimeConfig) -> Path:
+    return cfg.log_dir / ".token_verified.json"
+
+
+def _token_recently_verified(cfg: RuntimeConfig, token_hash: str) -> bool:
+    try:
+        cached = json.loads(_token_verify_cache_path(cfg).read_text(encoding="utf-8"))
+        verified_at = float(cached["verified_at"])
+    except (OSError, ValueError, TypeError, KeyError):
+        return False
+    age = time.time() - verified_at
+    return cached.get("hash") == token_hash and 0 <= age < TOKEN_VERIFY_CACHE_SECONDS
+
+
+def _remember_token_verified(cfg: RuntimeConfig, token_hash: str) -> None:
+    p = _token_verify_cache_path(cfg)
+    tmp = p.with_name(p.name + ".tmp")
+    try:
+        tmp.write_text(json.dumps({"hash": token_hash, "verified_at": time.time()}), encoding="utf-8")
+        os.replace(tmp, p)
+    except OSError:
+        pass
+
+
 def verify_github_token(cfg: RuntimeConfig, token: str, logger: EventLogger) -> bool:
+    # Supervisors restart the runner often; skip the API round-trip for a token verified within the hour.
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    if _token_recently_verified(cfg, token_hash):
+        logger.log("token.verify.cached", ok=True)
+        return True
+
     req = urlrequest.Request(
         "https://api.github.com/user",
         headers={
@@ -461,59 +760,246 @@ def verify_github_token(cfg: RuntimeConfig, token: str, logger: EventLogger) ->
     login = str(body.get("login", "")).strip()
     ok = bool(login)
     logger.log("token.verify", ok=ok, github_login=login or "unknown")
+    if ok:
+        _remember_token_verified(cfg, token_hash)
     return ok
 
 
+@functools.lru_cache(maxsize=32)
 def repo_name_from_url(repo_url: str) -> str:
     name = repo_url.rstrip("/").split("/")[-1]
     return name[:-4] if name.endswith(".git") else name
 
 
+def git_cmd(cfg: RuntimeConfig, repo_dir: Path, *args: str, timeout: int = 300) -> Tuple[int, str]:
+    # Identity is passed per invocation instead of persisted via `git config`.
+    return run_git(
+        repo_dir,
+        "-c",
+        f"user.name={cfg.git_identity_name}",
+        "-c",
+        f"user.email={cfg.git_identity_email}",
+        *args,
+        timeout=timeout,
+    )
+
+
+class GitRevReader:
+    """Long-lived `git cat-file --batch-check` co-process that resolves revisions to object ids.
+
+    Read-only lookups go through one pipe instead of a `git rev-parse` spawn each. git re-reads
+    refs and re-scans packs per query, so fetches, commits and resets are seen immediately.
+    """
+
+    READ_TIMEOUT_SECONDS = 10
+
+    def __init__(self, repo_dir: Path) -> None:
+        self.repo_dir = repo_dir
+        self._proc: Optional["subprocess.Popen[str]"] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> "subprocess.Popen[str]":
+        self._proc = subprocess.Popen(
+            [git_binary(), "-C", str(self.repo_dir), "cat-file", "--batch-check=%(objectname)"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            close_fds=False,
+        )
+        return self._proc
+
+    def _stop(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if proc.stdin:
+                proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:  # noqa: BLE001
+            proc.kill()
+
+    def _readline(self, proc: "subprocess.Popen[str]") -> Optional[str]:
+        """One answer line, "" if the helper died, None if it did not answer in time."""
+        # Answers are one flushed line each, so waiting on the fd then readline() cannot block.
+        assert proc.stdout is not None
+        with selectors.DefaultSelector() as sel:
+            sel.register(proc.stdout, selectors.EVENT_READ)
+            if not sel.select(timeout=self.READ_TIMEOUT_SECONDS):
+                return None
+        return proc.stdout.readline()
+
+    def _rev_parse(self, rev: str) -> Optional[str]:
+        code, out = run_git(self.repo_dir, "rev-parse", "--verify", "-q", rev, timeout=60)
+        oid = out.strip()
+        return oid if code == 0 and oid else None
+
+    def resolve(self, rev: str) -> Optional[str]:
+        if not rev or "\n" in rev:
+            return None
+        with self._lock:
+            # A dead helper is restarted once before falling back to a one-shot rev-parse.
+            for _ in range(2):
+                line: Optional[str] = ""
+                try:
+                    proc = self._proc if self._proc is not None and self._proc.poll() is None else self._start()
+                    if proc.stdin and proc.stdout:
+                        proc.stdin.write(rev + "\n")
+                        proc.stdin.flush()
+                        line = self._readline(proc)
+                except OSError:
+                    line = ""
+                if line is None:
+                    # Wedged: kill it rather than wait on it again, and answer with rev-parse.
+                    proc, self._proc = self._proc, None
+                    if proc is not None:
+                        proc.kill()
+                        proc.wait()
+                    break
+                if line:
+                    oid = line.strip()
+                    if oid and " " not in oid:
+                        return oid
+                    # Misses come back as "<rev> missing" / "<rev> ambiguous". Confirm them: a
+                    # helper that outlived its repo (rm -rf + reclone) answers "missing" for
+                    # everything, and must be replaced when rev-parse disagrees.
+                    confirmed = self._rev_parse(rev)
+                    if confirmed is not None:
+                        self._stop()
+                    return confirmed
+                self._stop()
+        return self._rev_parse(rev)
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+
+_GIT_REV_READERS: Dict[str, GitRevReader] = {}
+
+
+def resolve_rev(repo_dir: Path, rev: str) -> Optional[str]:
+    key = str(repo_dir)
+    reader = _GIT_REV_READERS.get(key)
+    if reader is None:
+        reader = _GIT_REV_READERS[key] = GitRevReader(repo_dir)
+    return reader.resolve(rev)
+
+
+def drop_git_rev_reader(repo_dir: Path) -> None:
+    reader = _GIT_REV_READERS.pop(str(repo_dir), None)
+    if reader is not None:
+        reader.close()
+
+
+@atexit.register
+def _close_git_rev_readers() -> None:
+    for reader in list(_GIT_REV_READERS.values()):
+        reader.close()
+
+
+def head_symref(repo_dir: Path) -> Optional[str]:
+    try:
+        with open(os.path.join(repo_dir, ".git", "HEAD"), encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        # .git may be a gitfile (worktree/submodule checkout); ask git instead.
+        code, out = run_git(repo_dir, "symbolic-ref", "-q", "HEAD")
+        return out.strip() if code == 0 else None
+    return head[5:].strip() if head.startswith("ref: ") else None
+
+
+def read_branch_state(cfg: RuntimeConfig, repo_dir: Path) -> Tuple[bool, bool]:
+    """Return (remote branch exists, HEAD already on local branch at remote tip) without spawning git."""
+    local_ref = f"refs/heads/{cfg.branch}"
+    remote_sha = resolve_rev(repo_dir, f"refs/remotes/origin/{cfg.branch}")
+    if remote_sha is None:
+        return False, False
+    if resolve_rev(repo_dir, local_ref) != remote_sha:
+        return True, False
+    return True, head_symref(repo_dir) == local_ref
+
+
+# repo_dir -> (monotonic time of last successful fetch, origin/<branch> sha it produced)
+_LAST_FETCH: Dict[str, Tuple[float, str]] = {}
+
+
+def remote_branch_sha(cfg: RuntimeConfig, repo_dir: Path) -> Optional[str]:
+    """Ask origin for the branch tip in one round-trip; "" if absent, None if the query failed."""
+    ref = f"refs/heads/{cfg.branch}"
+    code, out = git_cmd(cfg, repo_dir, "ls-remote", "origin", ref, timeout=60)
+    if code != 0:
+        return None
+    for line in out.splitlines():
+        sha, _, name = line.partition("\t")
+        if name.strip() == ref:
+            return sha.strip()
+    return ""
+
+
+def fetch_origin(cfg: RuntimeConfig, repo_dir: Path, logger: EventLogger, event_name: str) -> bool:
+    key = str(repo_dir)
+    last = _LAST_FETCH.get(key)
+    # Redo turns refresh back to back; if origin has not moved since a recent fetch, the
+    # local tracking ref is already current and the full fetch can be skipped.
+    if last is not None and time.monotonic() - last[0] < cfg.refresh_min_interval_seconds:
+        if remote_branch_sha(cfg, repo_dir) == last[1]:
+            logger.log(event_name, ok=True, skipped="remote_unchanged")
+            return True
+    code, out = git_cmd(cfg, repo_dir, "fetch", "origin", "--prune", timeout=300)
+    logger.log(event_name, ok=(code == 0), output=out[-800:])
+    if code != 0:
+        _LAST_FETCH.pop(key, None)
+        return False
+    _LAST_FETCH[key] = (time.monotonic(), resolve_rev(repo_dir, f"refs/remotes/origin/{cfg.branch}") or "")
+    return True
+
+
 def ensure_repo_synced(cfg: RuntimeConfig, token: str, logger: EventLogger) -> Tuple[bool, Path, str]:
     cfg.working_root.mkdir(parents=True, exist_ok=True)
     repo_dir = cfg.working_root / repo_name_from_url(cfg.repo_url)
     auth_url = inject_token_to_https_url(cfg.repo_url, token)
 
     if not (repo_dir / ".git").exists():
+        # A reader started against the old checkout would keep answering for a repo that is gone.
+        drop_git_rev_reader(repo_dir)
         code, out = run_cmd(["git", "clone", auth_url, str(repo_dir)], timeout=600)
         logger.log("repo.clone", ok=(code == 0), output=out[-800:])
         if code != 0:
             return False, repo_dir, "clone_failed"
         # Remove token from local git config remote.
-        run_cmd(["git", "remote", "set-url", "origin", cfg.repo_url], cwd=repo_dir)
+        run_git(repo_dir, "remote", "set-url", "origin", cfg.repo_url)
 
-    # Git identity
-    run_cmd(["git", "config", "user.name", cfg.git_identity_name], cwd=repo_dir)
-    run_cmd(["git", "config", "user.email", cfg.git_identity_email], cwd=repo_dir)
-
-    code, out = run_cmd(["git", "fetch", "origin", "--prune"], cwd=repo_dir, timeout=300)
-    logger.log("repo.fetch", ok=(code == 0), output=out[-800:])
-    if code != 0:
+    if not fetch_origin(cfg, repo_dir, logger, "repo.fetch"):
         return False, repo_dir, "fetch_failed"
 
     # Determine remote dev branch existence.
-    code, _ = run_cmd(["git", "show-ref", "--verify", f"refs/remotes/origin/{cfg.branch}"], cwd=repo_dir)
-    remote_dev_exists = code == 0
+    remote_dev_exists, head_at_remote = read_branch_state(cfg, repo_dir)
 
     if remote_dev_exists:
-        code, out = run_cmd(["git", "checkout", "-B", cfg.branch, f"origin/{cfg.branch}"], cwd=repo_dir)
-        logger.log("repo.checkout_dev", ok=(code == 0), output=out[-500:])
-        if code != 0:
-            return False, repo_dir, "checkout_dev_failed"
+        if head_at_remote:
+            logger.log("repo.checkout_dev", ok=True, skipped="head_at_remote")
+        else:
+            code, out = git_cmd(cfg, repo_dir, "checkout", "-B", cfg.branch, f"origin/{cfg.branch}")
+            logger.log("repo.checkout_dev", ok=(code == 0), output=out[-500:])
+            if code != 0:
+                return False, repo_dir, "checkout_dev_failed"
     else:
         # Create local dev from current HEAD.
-        code, out = run_cmd(["git", "checkout", "-B", cfg.branch], cwd=repo_dir)
+        code, out = git_cmd(cfg, repo_dir, "checkout", "-B", cfg.branch)
         logger.log("repo.create_dev", ok=(code == 0), output=out[-500:])
         if code != 0:
             return False, repo_dir, "create_dev_failed"
         # Push to remote dev.
-        code, out = run_cmd(["git", "push", auth_url, f"{cfg.branch}:{cfg.branch}", "-u"], cwd=repo_dir, timeout=300)
+        code, out = git_cmd(cfg, repo_dir, "push", auth_url, f"{cfg.branch}:{cfg.branch}", "-u", timeout=300)
         logger.log("repo.push_create_dev", ok=(code == 0), output=out[-800:])
         if code != 0:
             return False, repo_dir, "push_create_dev_failed"
 
     # Clean workspace to latest origin/dev baseline.
-    run_cmd(["git", "reset", "--hard", f"origin/{cfg.branch}"], cwd=repo_dir)
+    git_cmd(cfg, repo_dir, "reset", "--hard", f"origin/{cfg.branch}")
     if not clean_workspace(cfg, repo_dir, logger, "repo.clean"):
         return False, repo_dir, "clean_failed"
 
@@ -521,7 +1007,7 @@ def ensure_repo_synced(cfg: RuntimeConfig, token: str, logger: EventLogger) -> T
 
 
 def clean_workspace(cfg: RuntimeConfig, repo_dir: Path, logger: EventLogger, event_name: str) -> bool:
-    cmd = ["git", "clean", "-fd"]
+    cmd = ["clean", "-fd"]
     excludes: List[str] = []
     for raw in cfg.preserve_untracked_paths:
         rel = str(raw).strip()
@@ -529,26 +1015,27 @@ def clean_workspace(cfg: RuntimeConfig, repo_dir: Path, logger: EventLogger, eve
             continue
         excludes.append(rel)
         cmd.extend(["-e", rel])
-    code, out = run_cmd(cmd, cwd=repo_dir)
+    code, out = run_git(repo_dir, *cmd)
     logger.log(event_name, ok=(code == 0), excludes=excludes, output=out[-800:])
     return code == 0
 
 
 def refresh_repo_latest_from_remote(cfg: RuntimeConfig, repo_dir: Path, logger: EventLogger) -> bool:
-    code, out = run_cmd(["git", "fetch", "origin", "--prune"], cwd=repo_dir, timeout=300)
-    logger.log("repo.refresh.fetch", ok=(code == 0), output=out[-800:])
-    if code != 0:
+    if not fetch_origin(cfg, repo_dir, logger, "repo.refresh.fetch"):
         return False
 
-    code, _ = run_cmd(["git", "show-ref", "--verify", f"refs/remotes/origin/{cfg.branch}"], cwd=repo_dir)
-    if code == 0:
-        code, out = run_cmd(["git", "checkout", "-B", cfg.branch, f"origin/{cfg.branch}"], cwd=repo_dir)
-        logger.log("repo.refresh.checkout", ok=(code == 0), output=out[-500:], source=f"origin/{cfg.branch}")
-        if code != 0:
-            return False
-        run_cmd(["git", "reset", "--hard", f"origin/{cfg.branch}"], cwd=repo_dir)
+    remote_exists, head_at_remote = read_branch_state(cfg, repo_dir)
+    if remote_exists:
+        if head_at_remote:
+            logger.log("repo.refresh.checkout", ok=True, skipped="head_at_remote", source=f"origin/{cfg.branch}")
+        else:
+            code, out = git_cmd(cfg, repo_dir, "checkout", "-B", cfg.branch, f"origin/{cfg.branch}")
+            logger.log("repo.refresh.checkout", ok=(code == 0), output=out[-500:], source=f"origin/{cfg.branch}")
+            if code != 0:
+                return False
+        git_cmd(cfg, repo_dir, "reset", "--hard", f"origin/{cfg.branch}")
     else:
-        code, out = run_cmd(["git", "checkout", "-B", cfg.branch], cwd=repo_dir)
+        code, out = git_cmd(cfg, repo_dir, "checkout", "-B", cfg.branch)
         logger.log("repo.refresh.checkout", ok=(code == 0), output=out[-500:], source="local_head")
         if code != 0:
             return False
@@ -556,74 +1043,70 @@ def refresh_repo_latest_from_remote(cfg: RuntimeConfig, repo_dir: Path, logger:
     return clean_workspace(cfg, repo_dir, logger, "repo.refresh.clean")
 
 
+def refresh_and_prepare_prompt(
+    cfg: RuntimeConfig,
+    repo_dir: Path,
+    round_id: int,
+    redo_reason: Optional[str],
+    logger: EventLogger,
+) -> Tuple[bool, str]:
+    # The fetch waits on the network; build the prompt text meanwhile. Only the text:
+    # the refresh ends with `git clean`, so the prompt file is written afterwards.
+    report_abs = (repo_dir / cfg.report_path).resolve()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        refresh = pool.submit(refresh_repo_latest_from_remote, cfg, repo_dir, logger)
+        prompt_text = prepare_prompt(cfg, round_id, report_abs, redo_reason)
+        return refresh.result(), prompt_text
+
+
 def normalize_line(line: str) -> str:
     s = line.strip().lower()
     if not s:
         return ""
-    s = re.sub(r"\d+", "<n>", s)
-    s = re.sub(r"\s+", " ", s)
-    return s[:300]
+    return _WS_RE.sub(" ", _NUM_RE.sub("<n>", s))[:300]
 
 
 def looks_like_operation(line: str) -> bool:
-    keys = [
-        "test",
-        "testing",
-        "run",
-        "running",
-        "build",
-        "generate",
-        "fix",
-        "optimi",
-        "重构",
-        "优化",
-        "测试",
-        "生成",
-        "运行",
-    ]
-    ll = line.lower()
-    return any(k in ll for k in keys)
+    return _OPERATION_RE is not None and _OPERATION_RE.search(line) is not None
 
 
 def should_auto_confirm(line: str) -> bool:
-    ll = line.lower()
     if "?" not in line and "？" not in line:
         return False
-    trigger = ["是否", "确认", "继续", "proceed", "confirm", "y/n", "yes/no"]
-    return any(t in ll for t in trigger)
+    return _CONFIRM_RE is not None and _CONFIRM_RE.search(line) is not None
 
 
-def has_clear_progress(line: str) -> bool:
-    ll = line.lower()
-    patterns = [
-        r"\b\d{1,3}%\b",
-        r"eta",
-        r"remaining",
-        r"预计",
-        r"还需",
-        r"分钟",
-        r"min",
-        r"完成了",
-        r"progress",
-    ]
-    return any(re.search(p, ll) for p in patterns)
+def first_error_keyword(cfg: RuntimeConfig, line: str) -> Optional[str]:
+    if cfg.error_keyword_pattern is None or cfg.error_keyword_pattern.search(line) is None:
+        return None
+    # Rare hit path: keep config order for which keyword gets reported.
+    line_l = line.lower()
+    for kw in cfg.error_keywords:
+        if kw in line_l:
+            return kw
+    return None
 
 
-def prepare_prompt(cfg: RuntimeConfig, round_id: int, report_abs_path: Path, redo_reason: Optional[str]) -> str:
-    extra = f"\n上次审核未通过原因：{redo_reason}\n请基于该原因修正后重新执行。\n" if redo_reason else ""
-    non_doc_gate = ""
-    if cfg.require_non_doc_code_changes or has_substantive_threshold(cfg):
-        non_doc_gate = (
-            f"\n改动门槛（非文档文件）:\n"
-            f"- 至少 {max(0, cfg.minimum_non_doc_files_changed)} 个非文档文件改动\n"
-            f"- 至少 {max(0, cfg.minimum_non_doc_lines_changed)} 行非文档改动（新增+删除）\n"
-            "- 不满足门槛视为失败，不能退出。\n"
-        )
-    return f"""你是被{cfg.caller_name}调用的 AI 编程 CLI。
+def has_clear_progress(line: str) -> bool:
+    ll = line.lower()
+    return any(p.search(ll) for p in _PROGRESS_RES)
+
+
+@functools.lru_cache(maxsize=8)
+def _prompt_static(
+    caller_name: str,
+    project_name: str,
+    branch: str,
+    repo_url: str,
+    task_requirement: str,
+    report_abs_path: str,
+    non_doc_gate: str,
+) -> str:
+    return f"""你是被{caller_name}调用的 AI 编程 CLI。
 
-目标项目：{cfg.project_name}（分支：{cfg.branch}）
-目标仓库：{cfg.repo_url}
-本轮需求：{cfg.task_requirement}
+目标项目：{project_name}（分支：{branch}）
+目标仓库：{repo_url}
+本轮需求：{task_requirement}
 执行范围：全流程迭代升级（分析→优化/重构→运行→全量测试）。
 
 硬性要求：
@@ -648,27 +1131,104 @@ def prepare_prompt(cfg: RuntimeConfig, round_id: int, report_abs_path: Path, red
 执行策略：
 - 对任何执行确认问题，默认继续执行。
 - 优先输出可通过测试的稳定结果。
-{extra}
 """
 
 
+def prepare_prompt(cfg: RuntimeConfig, round_id: int, report_abs_path: Path, redo_reason: Optional[str]) -> str:
+    extra = f"\n上次审核未通过原因：{redo_reason}\n请基于该原因修正后重新执行。\n" if redo_reason else ""
+    non_doc_gate = ""
+    if cfg.require_non_doc_code_changes or has_substantive_threshold(cfg):
+        non_doc_gate = (
+            f"\n改动门槛（非文档文件）:\n"
+            f"- 至少 {max(0, cfg.minimum_non_doc_files_changed)} 个非文档文件改动\n"
+            f"- 至少 {max(0, cfg.minimum_non_doc_lines_changed)} 行非文档改动（新增+删除）\n"
+            "- 不满足门槛视为失败，不能退出。\n"
+        )
+    # Keyed by the fields themselves so CLI overrides applied after load_config stay correct.
+    static = _prompt_static(
+        cfg.caller_name,
+        cfg.project_name,
+        cfg.branch,
+        cfg.repo_url,
+        cfg.task_requirement,
+        str(report_abs_path),
+        non_doc_gate,
+    )
+    return f"{static}{extra}\n"
+
+
+# Directories already created by this process; see write_file_bytes for the stale case.
+_READY_DIRS: set[str] = set()
+
+
+def ensure_dir(dirpath: str) -> None:
+    if dirpath not in _READY_DIRS:
+        os.makedirs(dirpath, exist_ok=True)
+        _READY_DIRS.add(dirpath)
+
+
+def write_file_bytes(path: str, data: bytes) -> None:
+    dirpath = os.path.dirname(path)
+    ensure_dir(dirpath)
+    try:
+        f = open(path, "wb", buffering=1 << 16)
+    except FileNotFoundError:
+        # Directory removed behind our back (git clean -fd between attempts).
+        _READY_DIRS.discard(dirpath)
+        ensure_dir(dirpath)
+        f = open(path, "wb", buffering=1 << 16)
+    with f:
+        f.write(data)
+
+
+# path -> (content digest, mtime_ns, size) of the last prompt written there.
+_PROMPT_FILE_STATE: Dict[str, Tuple[bytes, int, int]] = {}
+
+
 def write_prompt_file(repo_dir: Path, relative_prompt_path: str, prompt_text: str) -> Path:
-    p = repo_dir / relative_prompt_path
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(prompt_text, encoding="utf-8")
-    return p
+    key = os.path.join(str(repo_dir), relative_prompt_path)
+    data = prompt_text.encode("utf-8")
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    cached = _PROMPT_FILE_STATE.get(key)
+    if cached is not None and cached[0] == digest:
+        try:
+            st = os.stat(key)
+        except OSError:
+            st = None
+        # Unchanged on disk since our last write (git clean or the CLI would change mtime/size).
+        if st is not None and (st.st_mtime_ns, st.st_size) == cached[1:]:
+            return Path(key)
+    write_file_bytes(key, data)
+    st = os.stat(key)
+    _PROMPT_FILE_STATE[key] = (digest, st.st_mtime_ns, st.st_size)
+    return Path(key)
+
+
+# path -> (inode, mtime_ns, size, parsed report). Callers treat reports as read-only.
+_REPORT_CACHE: Dict[str, Tuple[int, int, int, Dict[str, Any]]] = {}
 
 
 def load_report(repo_dir: Path, report_rel_path: str) -> Optional[Dict[str, Any]]:
-    report_path = repo_dir / report_rel_path
-    if not report_path.exists():
-        return None
+    path = os.path.join(str(repo_dir), report_rel_path)
     try:
-        data = json.loads(report_path.read_text(encoding="utf-8"))
-        if isinstance(data, dict):
-            return data
+        with open(path, encoding="utf-8") as f:
+            # fstat the handle we read from, so a file swapped in after the check is never
+            # served from the cache.
+            st = os.fstat(f.fileno())
+            cached = _REPORT_CACHE.get(path)
+            if cached is not None and cached[:3] == (st.st_ino, st.st_mtime_ns, st.st_size):
+                return cached[3]
+            data = json.loads(f.read())
+    except FileNotFoundError:
+        _REPORT_CACHE.pop(path, None)
+        return None
     except json.JSONDecodeError:
+        _REPORT_CACHE.pop(path, None)
         return None
+    if isinstance(data, dict):
+        _REPORT_CACHE[path] = (st.st_ino, st.st_mtime_ns, st.st_size, data)
+        return data
+    _REPORT_CACHE.pop(path, None)
     return None
 
 
@@ -696,30 +1256,82 @@ def pick_summary_line(lines: List[str]) -> str:
     return "CLI执行完成（未输出可用总结）"
 
 
+def tail_lines(text: str, n: int) -> List[str]:
+    # Same result as text.splitlines()[-n:] for "\n"-separated text, but only splits the tail.
+    if not text:
+        return []
+    if text.endswith("\n"):
+        text = text[:-1]
+    return text.rsplit("\n", n)[-n:]
+
+
 def estimate_test_pass_rate(output: str, exit_code: int) -> float:
-    text = output.lower()
-    pass_hits = re.findall(r"(\d+)\s+passed", text)
-    fail_hits = re.findall(r"(\d+)\s+failed", text)
-    passed = int(pass_hits[-1]) if pass_hits else None
-    failed = int(fail_hits[-1]) if fail_hits else None
+    # pytest/unittest print totals last, so only the trailing summary region matters.
+    tail = output[-_SUMMARY_TAIL_CHARS:]
+    if len(output) > _SUMMARY_TAIL_CHARS:
+        # Drop the partial first line so a count is never cut in half.
+        nl = tail.find("\n")
+        if nl >= 0:
+            tail = tail[nl + 1 :]
+    tail = tail.lower()
+    if "passed" not in tail and "failed" not in tail:
+        return 100.0 if exit_code == 0 else 0.0
+
+    passed: Optional[int] = None
+    failed: Optional[int] = None
+    for m in reversed(list(_SUMMARY_RE.finditer(tail))):
+        if m.group(2) == "passed":
+            if passed is None:
+                passed = int(m.group(1))
+        elif failed is None:
+            failed = int(m.group(1))
+        if passed is not None and failed is not None:
+            break
 
     if passed is not None and failed is not None and (passed + failed) > 0:
         return (passed * 100.0) / float(passed + failed)
     if passed is not None and passed > 0:
         return 100.0 if exit_code == 0 else 0.0
-    if "ok" in text and exit_code == 0:
-        return 100.0
     return 100.0 if exit_code == 0 else 0.0
 
 
+def probe_fallback_command(command: str, repo_dir: Path) -> bool:
+    try:
+        parts = shlex.split(command)
+    except ValueError:
+        # Let the real run surface the parse error.
+        return True
+    if not parts:
+        return False
+    binary = parts[0]
+    if "=" in binary:
+        # Leading env assignment (FOO=1 pytest); cannot tell cheaply.
+        return True
+    if shutil.which(binary) is not None:
+        return True
+    # Login shell PATH may differ from ours (pyenv, nvm, ...).
+    code, _ = run_cmd(["bash", "-lc", f"command -v {shlex.quote(binary)}"], cwd=repo_dir, timeout=5)
+    # Only an explicit "not found" skips the candidate; a slow login profile hitting the
+    # timeout, or any other failure, leaves the decision to the real run.
+    return code not in (1, 127)
+
+
 def run_validation_for_fallback(
     cfg: RuntimeConfig,
     repo_dir: Path,
     logger: EventLogger,
 ) -> Tuple[str, int, float, str]:
-    for cmd in cfg.fallback_test_command_candidates:
-        command = cmd.strip()
-        if not command:
+    commands = [cmd.strip() for cmd in cfg.fallback_test_command_candidates if cmd.strip()]
+    if not commands:
+        return "", 1, 0.0, "No available validation command"
+
+    # Probe all candidates concurrently, then run only the first available one in priority order.
+    with ThreadPoolExecutor(max_workers=len(commands)) as pool:
+        available = list(pool.map(lambda c: probe_fallback_command(c, repo_dir), commands))
+
+    for command, ok in zip(commands, available):
+        if not ok:
+            logger.log("fallback.test.unavailable", command=command)
             continue
         try:
             code, out = run_cmd(
@@ -730,10 +1342,11 @@ def run_validation_for_fallback(
         except subprocess.TimeoutExpired:
             logger.log("fallback.test.timeout", command=command, timeout=cfg.fallback_test_timeout_seconds)
             return command, 124, 0.0, "Validation command timeout"
-        lower = out.lower()
-        if code == 127 and ("command not found" in lower or "not recognized" in lower):
-            logger.log("fallback.test.unavailable", command=command)
-            continue
+        if code == 127:
+            lower = out.lower()
+            if "command not found" in lower or "not recognized" in lower:
+                logger.log("fallback.test.unavailable", command=command)
+                continue
 
         rate = estimate_test_pass_rate(out, code)
         logger.log(
@@ -741,7 +1354,7 @@ def run_validation_for_fallback(
             command=command,
             exit_code=code,
             pass_rate=round(rate, 2),
-            output_tail=out.splitlines()[-20:],
+            output_tail=tail_lines(out, 20),
         )
         return command, code, rate, out
 
@@ -790,8 +1403,7 @@ def build_fallback_report(
         "cli_reason": exec_result.reason,
         "cli_exit_code": exec_result.exit_code,
     }
-    report_abs_path.parent.mkdir(parents=True, exist_ok=True)
-    report_abs_path.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    write_file_bytes(str(report_abs_path), (json.dumps(report, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
     logger.log(
         "fallback.report.generated",
         tool=tool.name,
@@ -806,7 +1418,7 @@ def parse_rate(value: Any) -> float:
     if isinstance(value, (int, float)):
         return float(value)
     if isinstance(value, str):
-        m = re.search(r"(\d+(?:\.\d+)?)", value)
+        m = _RATE_RE.search(value)
         if m:
             return float(m.group(1))
     return 0.0
@@ -852,22 +1464,44 @@ def audit_report(report: Dict[str, Any], min_rate: float, strict_require_real_re
     )
 
 
-def parse_staged_name_status(status_output: str) -> List[Tuple[str, str]]:
+_STAGED_STATUSES = frozenset("AMDRCTU")
+
+
+def parse_staged_diff(diff_output: str) -> Tuple[List[Tuple[str, str]], List[Tuple[str, int, int]]]:
+    # Input is `git diff --raw [--numstat] -z --no-renames`. Raw records are
+    # ":<modes> <shas> <status>" followed by a path field; numstat records are a single
+    # "<added>\t<deleted>\t<path>" field. Paths are verbatim (no core.quotePath escaping).
+    fields = diff_output.split("\0")
     entries: List[Tuple[str, str]] = []
-    for raw in status_output.splitlines():
-        line = raw.strip()
-        if not line:
+    rows: List[Tuple[str, int, int]] = []
+    i = 0
+    n = len(fields)
+    while i < n:
+        field = fields[i]
+        if field.startswith(":"):
+            path = fields[i + 1] if i + 1 < n else ""
+            i += 2
+            if not path:
+                continue
+            status = field[field.rfind(" ") + 1 :][:1].upper() or "M"
+            if status not in _STAGED_STATUSES:
+                status = "M"
+            entries.append((status, path))
             continue
-        parts = line.split("\t", 1)
-        status_raw = parts[0].strip().upper()
-        path = parts[1].strip() if len(parts) > 1 else ""
-        if not path:
+        i += 1
+        parts = field.split("\t", 2)
+        if len(parts) < 3 or not parts[2]:
             continue
-        status = status_raw[:1] if status_raw else "M"
-        if status not in {"A", "M", "D", "R", "C", "T", "U"}:
-            status = "M"
-        entries.append((status, path))
-    return entries
+        # Counts are plain digits; binary files report "-", counted as one line each way.
+        added_s, deleted_s, path = parts
+        rows.append(
+            (
+                path,
+                int(added_s) if added_s.isdigit() else 1,
+                int(deleted_s) if deleted_s.isdigit() else 1,
+            )
+        )
+    return entries, rows
 
 
 def summarize_staged_changes(entries: List[Tuple[str, str]], max_items: int = 8) -> str:
@@ -883,20 +1517,13 @@ def summarize_staged_changes(entries: List[Tuple[str, str]], max_items: int = 8)
     return summary
 
 
-def is_doc_like_path(path: str) -> bool:
-    p = path.strip().lower()
-    if not p:
-        return False
-
-    doc_prefixes = (
-        "docs/",
-        "doc/",
-        ".github/",
-    )
-    if p.startswith(doc_prefixes):
-        return True
-
-    doc_files = {
+_DOC_PREFIXES = (
+    "docs/",
+    "doc/",
+    ".github/",
+)
+_DOC_FILES = frozenset(
+    {
         "readme.md",
         "changelog.md",
         "contributing.md",
@@ -906,45 +1533,26 @@ def is_doc_like_path(path: str) -> bool:
         "license",
         "citation.cff",
     }
-    if p.split("/")[-1] in doc_files:
-        return True
-
-    doc_exts = {
-        ".md",
-        ".markdown",
-        ".mdx",
-        ".rst",
-        ".txt",
-        ".adoc",
-        ".org",
-        ".rtf",
-        ".pdf",
-    }
-    return any(p.endswith(ext) for ext in doc_exts)
+)
+_DOC_EXTS = (
+    ".md",
+    ".markdown",
+    ".mdx",
+    ".rst",
+    ".txt",
+    ".adoc",
+    ".org",
+    ".rtf",
+    ".pdf",
+)
 
 
-def parse_staged_numstat(numstat_output: str) -> List[Tuple[str, int, int]]:
-    rows: List[Tuple[str, int, int]] = []
-    for raw in numstat_output.splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-        parts = line.split("\t")
-        if len(parts) < 3:
-            continue
-        add_s, del_s, path = parts[0].strip(), parts[1].strip(), parts[2].strip()
-        if not path:
-            continue
-        try:
-            added = int(add_s)
-        except ValueError:
-            added = 1
-        try:
-            deleted = int(del_s)
-        except ValueError:
-            deleted = 1
-        rows.append((path, max(0, added), max(0, deleted)))
-    return rows
+def is_doc_like_path(path: str) -> bool:
+    p = path.strip().lower()
+    if not p:
+        return False
+    # Tuple arguments keep each check to a single C-level startswith/endswith call.
+    return p.startswith(_DOC_PREFIXES) or p.endswith(_DOC_EXTS) or p.rpartition("/")[2] in _DOC_FILES
 
 
 def has_substantive_threshold(cfg: RuntimeConfig) -> bool:
@@ -960,54 +1568,60 @@ def commit_and_push(
 ) -> Tuple[bool, str, Optional[str]]:
     auth_url = inject_token_to_https_url(cfg.repo_url, token)
 
-    run_cmd(["git", "add", "-A"], cwd=repo_dir)
+    run_git(repo_dir, "add", "-A")
     # Never commit runtime artifacts (prompts, reports, local CLI metadata, etc.).
-    never_commit_paths = [
-        cfg.prompt_path,
-        cfg.report_path,
-        ".openclaw/openclaw_init_prompt.md",
-        ".openclaw/init_state",
-        *cfg.never_commit_paths,
-    ]
-    seen: set[str] = set()
-    for rel in never_commit_paths:
-        key = str(rel).strip()
-        if not key or key in seen:
-            continue
-        seen.add(key)
-        run_cmd(["git", "reset", "-q", "HEAD", "--", key], cwd=repo_dir)
-
-    code, status_out = run_cmd(["git", "diff", "--cached", "--name-status", "--no-renames"], cwd=repo_dir)
+    keys = cfg.never_commit_pathspecs
+    # One reset for every pathspec; unmatched ones are ignored. If a bad pathspec makes the
+    # batch fail, fall back to per-path resets so the valid ones still get unstaged.
+    code, _ = run_git(repo_dir, "reset", "-q", "HEAD", "--", *keys)
     if code != 0:
-        logger.log("git.status_failed", output=status_out[-800:])
+        for key in keys:
+            run_git(repo_dir, "reset", "-q", "HEAD", "--", key)
+
+    # One diff call yields the status list and, only when a line threshold needs it, numstat
+    # (file counts come from the status entries; numstat makes git diff file contents).
+    min_files = max(0, int(cfg.minimum_non_doc_files_changed))
+    min_lines = max(0, int(cfg.minimum_non_doc_lines_changed))
+    need_numstat = min_lines > 0
+    diff_args = ["diff", "--cached", "--no-renames", "-z", "--raw"]
+    if need_numstat:
+        diff_args.append("--numstat")
+    code, diff_out = run_git(repo_dir, *diff_args)
+    if code != 0:
+        logger.log("git.status_failed", output=diff_out[-800:])
         return False, "git_status_failed", None
 
-    staged_entries = parse_staged_name_status(status_out)
+    staged_entries, num_rows = parse_staged_diff(diff_out)
     if not staged_entries:
         logger.log("git.no_changes")
         return True, "no_changes", None
 
     changes_summary = summarize_staged_changes(staged_entries)
+    # Classify each staged path once; the numstat filter below reuses the result.
+    doc_flags = {p: is_doc_like_path(p) for _, p in staged_entries}
 
     if cfg.require_non_doc_code_changes:
-        non_doc_entries = [(s, p) for s, p in staged_entries if not is_doc_like_path(p)]
+        non_doc_entries = [(s, p) for s, p in staged_entries if not doc_flags[p]]
         if not non_doc_entries:
             logger.log("git.docs_only_changes", changes=changes_summary)
             return True, "docs_only_changes", None
 
     if has_substantive_threshold(cfg):
-        code, numstat_out = run_cmd(["git", "diff", "--cached", "--numstat", "--no-renames"], cwd=repo_dir)
-        if code != 0:
-            logger.log("git.numstat_failed", output=numstat_out[-800:])
-            return False, "git_numstat_failed", None
-
-        num_rows = parse_staged_numstat(numstat_out)
-        non_doc_rows = [(path, add, delete) for path, add, delete in num_rows if not is_doc_like_path(path)]
-        non_doc_file_count = len(non_doc_rows)
-        non_doc_line_count = sum(add + delete for _, add, delete in non_doc_rows)
-        min_files = max(0, int(cfg.minimum_non_doc_files_changed))
-        min_lines = max(0, int(cfg.minimum_non_doc_lines_changed))
-        if (non_doc_file_count < min_files) or (non_doc_line_count < min_lines):
+        non_doc_line_count: Optional[int] = None
+        if need_numstat:
+            non_doc_rows = []
+            for path, add, delete in num_rows:
+                is_doc = doc_flags.get(path)
+                if is_doc is None:
+                    is_doc = is_doc_like_path(path)
+                if not is_doc:
+                    non_doc_rows.append((path, add, delete))
+            non_doc_file_count = len(non_doc_rows)
+            non_doc_line_count = sum(add + delete for _, add, delete in non_doc_rows)
+        else:
+            # --no-renames gives one status entry per file, the same count numstat would report.
+            non_doc_file_count = sum(1 for _, p in staged_entries if not doc_flags[p])
+        if (non_doc_file_count < min_files) or (non_doc_line_count is not None and non_doc_line_count < min_lines):
             logger.log(
                 "git.changes_below_threshold",
                 non_doc_files=non_doc_file_count,
@@ -1021,32 +1635,27 @@ def commit_and_push(
     core = audit.core_optimization.replace("\n", " ").strip()
     if len(core) > 30:
         core = core[:30].rstrip() + "..."
-    rate_str = f"{audit.test_pass_rate:.0f}"
+    fields = {
+        "project": cfg.project_name,
+        "core": core or "常规优化",
+        "rate": f"{audit.test_pass_rate:.0f}",
+        "changes": changes_summary,
+    }
+    # Load-time validation uses sample values; real ones can still fail (e.g. {rate[2]}).
     try:
-        message = cfg.commit_message_template.format(
-            project=cfg.project_name,
-            core=core or "常规优化",
-            rate=rate_str,
-            changes=changes_summary,
-        )
+        message = cfg.commit_message_template.format(**fields)
     except Exception as e:  # noqa: BLE001
-        message = DEFAULT_CONFIG["commit_message_template"].format(
-            project=cfg.project_name,
-            core=core or "常规优化",
-            rate=rate_str,
-            changes=changes_summary,
-        )
-        logger.log("git.commit_template_invalid", template=cfg.commit_message_template, error=str(e))
+        message = DEFAULT_CONFIG["commit_message_template"].format(**fields)
+        logger.log("git.commit_template_invalid", template=cfg.commit_message_template, error=str(e) or type(e).__name__)
 
-    code, out = run_cmd(["git", "commit", "-m", message], cwd=repo_dir)
+    code, out = git_cmd(cfg, repo_dir, "commit", "-m", message)
     logger.log("git.commit", ok=(code == 0), message=message, changes=changes_summary, output=out[-800:])
     if code != 0:
         return False, "commit_failed", None
 
-    code, out = run_cmd(["git", "rev-parse", "HEAD"], cwd=repo_dir)
-    commit_hash = out.strip() if code == 0 else None
+    commit_hash = resolve_rev(repo_dir, "HEAD")
 
-    code, out = run_cmd(["git", "push", auth_url, f"{cfg.branch}:{cfg.branch}"], cwd=repo_dir, timeout=300)
+    code, out = run_git(repo_dir, "push", auth_url, f"{cfg.branch}:{cfg.branch}", timeout=300)
     logger.log("git.push", ok=(code == 0), output=out[-1000:])
     if code != 0:
         return False, "push_failed", commit_hash
@@ -1055,7 +1664,7 @@ def commit_and_push(
 
 
 def rollback_repo(repo_dir: Path, cfg: RuntimeConfig, logger: EventLogger) -> None:
-    run_cmd(["git", "reset", "--hard", "HEAD"], cwd=repo_dir)
+    run_git(repo_dir, "reset", "--hard", "HEAD")
     clean_workspace(cfg, repo_dir, logger, "repo.rollback.clean")
     logger.log("repo.rollback", detail="git reset --hard HEAD && git clean -fd (with preserve list)")
 
@@ -1069,8 +1678,12 @@ def monitor_cli_process(
     logger: EventLogger,
     timeouts: Optional[Timeouts] = None,
 ) -> CLIExecutionResult:
-    q: "queue.Queue[Optional[Tuple[float, str]]]" = queue.Queue()
-    output_lines: List[str] = []
+    # Only the most recent lines are returned; older ones fall off as new ones arrive.
+    output_lines: "collections.deque[str]" = collections.deque(maxlen=CLI_OUTPUT_KEEP_LINES)
+    line_count = 0
+    # Codex prints its session id once near the start; catch it before the tail cap drops it.
+    watch_session_id = is_codex_tool(tool)
+    codex_session_id: Optional[str] = None
 
     cmd = ["bash", "-lc", command]
     start = time.monotonic()
@@ -1082,8 +1695,6 @@ def monitor_cli_process(
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
         )
     except Exception as e:  # noqa: BLE001
         return CLIExecutionResult(
@@ -1098,20 +1709,21 @@ def monitor_cli_process(
             progress_probe_sent=False,
         )
 
-    def reader_thread() -> None:
-        if proc.stdout is None:
-            q.put(None)
-            return
-        for line in proc.stdout:
-            q.put((time.monotonic(), line.rstrip("\n")))
-        q.put(None)
-
-    t = threading.Thread(target=reader_thread, daemon=True)
-    t.start()
+    # Read stdout straight from the fd with a selector instead of a reader thread + queue.
+    # Both pipes are binary: stdout bytes are decoded per chunk here, stdin writes are encoded.
+    sel = selectors.DefaultSelector()
+    out_fd = -1
+    if proc.stdout is not None:
+        out_fd = proc.stdout.fileno()
+        os.set_blocking(out_fd, False)
+        sel.register(out_fd, selectors.EVENT_READ)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    eof = out_fd < 0
 
     if tool.send_prompt_via_stdin and proc.stdin:
         try:
-            proc.stdin.write(prompt_text + "\n")
+            proc.stdin.write((prompt_text + "\n").encode("utf-8"))
             proc.stdin.flush()
         except Exception:  # noqa: BLE001
             pass
@@ -1131,33 +1743,54 @@ def monitor_cli_process(
     terminate_reason = "completed"
 
     while True:
-        now = time.monotonic()
-
-        # process output queue
-        try:
-            item = q.get(timeout=1)
-        except queue.Empty:
-            item = "_NO_LINE_"
-
-        if item is None:
-            # reader finished
-            if proc.poll() is not None:
-                break
-        elif item != "_NO_LINE_":
-            ts, line = item
+        lines: List[str] = []
+        got_output = False
+        if eof:
+            try:
+                proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
+        elif sel.select(timeout=1):
+            try:
+                chunk = os.read(out_fd, 65536)
+            except BlockingIOError:
+                chunk = None
+            if chunk is not None:
+                got_output = True
+                if not chunk:
+                    eof = True
+                    sel.unregister(out_fd)
+                text = pending + decoder.decode(chunk, final=eof)
+                # Match the universal-newline splitting of the old text-mode pipe; a trailing
+                # "\r" is held back in case the "\n" of a "\r\n" is in the next chunk.
+                hold_cr = (not eof) and text.endswith("\r")
+                if hold_cr:
+                    text = text[:-1]
+                lines = _NEWLINE_RE.split(text)
+                pending = lines.pop()
+                if hold_cr:
+                    pending += "\r"
+                elif eof and pending:
+                    lines.append(pending)
+                    pending = ""
+
+        ts = time.monotonic()
+        for line in lines:
             last_output_time = ts
             output_lines.append(line)
+            line_count += 1
 
-            if len(output_lines) % 20 == 0:
-                logger.log("cli.output.progress", tool=tool.name, lines=len(output_lines))
+            if watch_session_id and codex_session_id is None:
+                m = _CODEX_SESSION_RE.search(line)
+                if m:
+                    codex_session_id = m.group(1)
 
-            line_l = line.lower()
-            for kw in cfg.error_keywords:
-                if kw in line_l:
-                    saw_error_keyword = kw
-                    terminate_reason = f"error_keyword:{kw}"
-                    break
+            if line_count % 20 == 0:
+                logger.log("cli.output.progress", tool=tool.name, lines=line_count)
+
+            saw_error_keyword = first_error_keyword(cfg, line)
             if saw_error_keyword:
+                terminate_reason = f"error_keyword:{saw_error_keyword}"
                 break
 
             sig = normalize_line(line)
@@ -1174,7 +1807,7 @@ def monitor_cli_process(
             if should_auto_confirm(line):
                 if proc.stdin and (time.monotonic() - last_auto_confirm_at > 2):
                     try:
-                        proc.stdin.write(cfg.auto_confirm_reply + "\n")
+                        proc.stdin.write((cfg.auto_confirm_reply + "\n").encode("utf-8"))
                         proc.stdin.flush()
                         last_auto_confirm_at = time.monotonic()
                         logger.log("cli.auto_confirm", tool=tool.name)
@@ -1186,6 +1819,9 @@ def monitor_cli_process(
                 if has_clear_progress(line):
                     progress_probe_clear = True
 
+        if terminate_reason != "completed":
+            break
+
         now = time.monotonic()
         runtime = now - start
 
@@ -1200,7 +1836,7 @@ def monitor_cli_process(
             progress_probe_at = now
             if proc.stdin:
                 try:
-                    proc.stdin.write(cfg.progress_probe_message + "\n")
+                    proc.stdin.write((cfg.progress_probe_message + "\n").encode("utf-8"))
                     proc.stdin.flush()
                     logger.log("cli.progress_probe.sent", tool=tool.name)
                 except Exception:  # noqa: BLE001
@@ -1220,9 +1856,12 @@ def monitor_cli_process(
             terminate_reason = "max_runtime_exceeded"
             break
 
-        if proc.poll() is not None:
+        # Once the process has exited, keep reading until the pipe is drained or quiet.
+        if proc.poll() is not None and (eof or not got_output):
             break
 
+    sel.close()
+
     terminated = False
     if terminate_reason != "completed":
         terminated = True
@@ -1244,15 +1883,21 @@ def monitor_cli_process(
         reason=terminate_reason,
         exit_code=exit_code,
         duration_seconds=duration,
-        output_lines=output_lines[-2000:],
+        output_lines=list(output_lines),
+        output_tail=list(itertools.islice(output_lines, max(0, len(output_lines) - CLI_OUTPUT_TAIL_LINES), None)),
         saw_error_keyword=saw_error_keyword,
         loop_detected=loop_detected,
         progress_probe_sent=progress_probe_sent,
+        codex_session_id=codex_session_id,
     )
 
 
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+@functools.lru_cache(maxsize=64)
 def cli_slug(name: str) -> str:
-    slug = re.sub(r"[^a-z0-9]+", "_", name.strip().lower()).strip("_")
+    slug = _SLUG_RE.sub("_", name.strip().lower()).strip("_")
     return slug or "cli"
 
 
@@ -1291,15 +1936,6 @@ def is_codex_tool(tool: CLIConfig) -> bool:
     return "codex" in tool.name.strip().lower()
 
 
-def extract_codex_session_id(output_lines: List[str]) -> Optional[str]:
-    pattern = re.compile(r"session id:\s*([0-9a-fA-F-]{36})")
-    for line in output_lines:
-        m = pattern.search(line)
-        if m:
-            return m.group(1)
-    return None
-
-
 def write_cli_transcript(
     cfg: RuntimeConfig,
     round_id: int,
@@ -1311,13 +1947,15 @@ def write_cli_transcript(
     if not cfg.save_cli_transcripts:
         return None
     out_dir = cfg.log_dir / "cli_transcripts"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    ensure_dir(str(out_dir))
+    # One clock read so the filename stamp and the header time always agree.
+    now = datetime.now(_UTC)
+    ts = now.strftime("%Y%m%dT%H%M%SZ")
     out_path = out_dir / (
         f"round{round_id:04d}_{cli_slug(tool.name)}_{phase}_attempt{attempt_no:02d}_{ts}.log"
     )
     header = [
-        f"time_utc: {datetime.now(timezone.utc).isoformat()}",
+        f"time_utc: {now.isoformat(timespec='seconds')}",
         f"round_id: {round_id}",
         f"tool: {tool.name}",
         f"phase: {phase}",
@@ -1328,8 +1966,13 @@ def write_cli_transcript(
         f"duration_seconds: {result.duration_seconds:.2f}",
         "---- output ----",
     ]
-    payload = "\n".join(header + result.output_lines) + "\n"
-    out_path.write_text(payload, encoding="utf-8")
+    # Stream the lines instead of joining one big string, and publish the file with an
+    # atomic rename so a killed run never leaves a half-written transcript behind.
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in header)
+        f.writelines(line + "\n" for line in result.output_lines)
+    os.replace(tmp_path, out_path)
     return out_path
 
 
@@ -1479,7 +2122,7 @@ def run_cli_init_if_needed(
         reason=result.reason,
         exit_code=result.exit_code,
         duration_seconds=round(result.duration_seconds, 2),
-        output_tail=result.output_lines[-20:],
+        output_tail=result.output_tail,
     )
 
     ok = (not result.terminated) and (result.saw_error_keyword is None) and (result.exit_code in (0, None))
@@ -1519,7 +2162,7 @@ def run_cli_init_if_needed(
             reason=rem_result.reason,
             exit_code=rem_result.exit_code,
             duration_seconds=round(rem_result.duration_seconds, 2),
-            output_tail=rem_result.output_lines[-20:],
+            output_tail=rem_result.output_tail,
         )
         rem_ok = (not rem_result.terminated) and (rem_result.saw_error_keyword is None) and (rem_result.exit_code in (0, None))
         if not rem_ok:
@@ -1544,7 +2187,7 @@ def run_cli_init_if_needed(
     marker.write_text(
         json.dumps(
             {
-                "ts": datetime.now(timezone.utc).isoformat(),
+                "ts": utc_now_iso(),
                 "tool": tool.name,
                 "duration_seconds": round(result.duration_seconds, 2),
                 "exit_code": result.exit_code,
@@ -1569,6 +2212,7 @@ def run_cli_attempt(
     attempt_no: int,
     redo_reason: Optional[str],
     logger: EventLogger,
+    prompt_text: Optional[str] = None,
 ) -> Tuple[CLIExecutionResult, Optional[Dict[str, Any]]]:
     report_abs = (repo_dir / cfg.report_path).resolve()
     report_abs.parent.mkdir(parents=True, exist_ok=True)
@@ -1577,7 +2221,8 @@ def run_cli_attempt(
     if report_abs.exists():
         report_abs.unlink()
 
-    prompt_text = prepare_prompt(cfg, round_id, report_abs, redo_reason)
+    if prompt_text is None:
+        prompt_text = prepare_prompt(cfg, round_id, report_abs, redo_reason)
     prompt_path = write_prompt_file(repo_dir, cfg.prompt_path, prompt_text)
 
     cmd = format_cli_command(
@@ -1605,7 +2250,7 @@ def run_cli_attempt(
         exit_code=result.exit_code,
         duration_seconds=round(result.duration_seconds, 2),
         lines=len(result.output_lines),
-        output_tail=result.output_lines[-20:],
+        output_tail=result.output_tail,
         transcript_path=str(transcript_path) if transcript_path else None,
     )
 
@@ -1614,7 +2259,7 @@ def run_cli_attempt(
         logger.log("report.loaded", tool=tool.name, keys=list(report.keys()))
     else:
         if cfg.codex_resume_on_incomplete and is_codex_tool(tool):
-            session_id = extract_codex_session_id(result.output_lines)
+            session_id = result.codex_session_id
             if session_id:
                 max_resume = max(0, int(cfg.codex_resume_max_attempts))
                 for resume_idx in range(1, max_resume + 1):
@@ -1652,7 +2297,7 @@ def run_cli_attempt(
                         reason=resume_result.reason,
                         exit_code=resume_result.exit_code,
                         duration_seconds=round(resume_result.duration_seconds, 2),
-                        output_tail=resume_result.output_lines[-20:],
+                        output_tail=resume_result.output_tail,
                         transcript_path=str(resume_transcript) if resume_transcript else None,
                     )
                     report = load_report(repo_dir, cfg.report_path)
@@ -1688,9 +2333,28 @@ def select_cli_tool(cfg: RuntimeConfig, selector: str) -> Optional[CLIConfig]:
     return None
 
 
+_NO_ALT_SCREEN_RE = re.compile(r"\s--no-alt-screen(?=\s|$)")
+_CODEX_ALT_SCREEN_CACHE: Dict[Tuple[str, str, int], bool] = {}
+
+
 def codex_supports_no_alt_screen(repo_dir: Path) -> bool:
+    # The help text only changes with the binary, so key on its resolved path and mtime
+    # (os.stat follows the npm symlink, so an upgrade invalidates the entry).
+    binary = shutil.which("codex") or ""
+    try:
+        mtime = os.stat(binary).st_mtime_ns if binary else 0
+    except OSError:
+        mtime = 0
+    key = (str(repo_dir), binary, mtime)
+    cached = _CODEX_ALT_SCREEN_CACHE.get(key)
+    if cached is not None:
+        return cached
     code, out = run_cmd(["bash", "-lc", "codex -h"], cwd=repo_dir, timeout=20)
-    return (code == 0) and ("--no-alt-screen" in out)
+    supported = (code == 0) and ("--no-alt-screen" in out)
+    # A timed-out probe says nothing about the binary; ask again next time.
+    if code != 124:
+        _CODEX_ALT_SCREEN_CACHE[key] = supported
+    return supported
 
 
 def apply_interactive_command_compat(
@@ -1701,7 +2365,7 @@ def apply_interactive_command_compat(
 ) -> str:
     if "codex" in tool.name.lower() and "--no-alt-screen" in cmd:
         if not codex_supports_no_alt_screen(repo_dir):
-            patched = re.sub(r"\s--no-alt-screen(?=\s|$)", "", cmd, count=1)
+            patched = _NO_ALT_SCREEN_RE.sub("", cmd, count=1)
             logger.log(
                 "cli.interactive.compat",
                 tool=tool.name,
@@ -1719,13 +2383,15 @@ def run_cli_attempt_interactive(
     round_id: int,
     redo_reason: Optional[str],
     logger: EventLogger,
+    prompt_text: Optional[str] = None,
 ) -> Tuple[CLIExecutionResult, Optional[Dict[str, Any]]]:
     report_abs = (repo_dir / cfg.report_path).resolve()
     report_abs.parent.mkdir(parents=True, exist_ok=True)
     if report_abs.exists():
         report_abs.unlink()
 
-    prompt_text = prepare_prompt(cfg, round_id, report_abs, redo_reason)
+    if prompt_text is None:
+        prompt_text = prepare_prompt(cfg, round_id, report_abs, redo_reason)
     prompt_path = write_prompt_file(repo_dir, cfg.prompt_path, prompt_text)
 
     cmd_tpl = tool.interactive_command.strip() or tool.command
@@ -1805,84 +2471,50 @@ def run_single_round_interactive(
     if not ok:
         msg = f"仓库同步失败: {reason}"
         logger.log("round.pause", round_id=round_id, reason=msg, mode="interactive")
-        return RoundResult(
-            status="paused",
-            round_id=round_id,
-            tool_used=None,
-            audit_result=None,
-            commit_status="not_started",
-            commit_hash=None,
-            message=msg,
-        )
+        return _paused_result(round_id, None, msg)
 
     tool = select_cli_tool(cfg, interactive_cli)
     if tool is None:
         msg = f"未找到指定CLI: {interactive_cli}"
         logger.log("round.pause", round_id=round_id, reason=msg, mode="interactive")
-        return RoundResult(
-            status="paused",
-            round_id=round_id,
-            tool_used=None,
-            audit_result=None,
-            commit_status="not_started",
-            commit_hash=None,
-            message=msg,
-        )
+        return _paused_result(round_id, None, msg)
 
     if not refresh_repo_latest_from_remote(cfg, repo_dir, logger):
         msg = "执行交互前拉取远端最新代码失败"
         logger.log("round.pause", round_id=round_id, reason=msg, mode="interactive")
-        return RoundResult(
-            status="paused",
-            round_id=round_id,
-            tool_used=tool.name,
-            audit_result=None,
-            commit_status="not_started",
-            commit_hash=None,
-            message=msg,
-        )
+        return _paused_result(round_id, tool.name, msg)
 
     if not run_cli_init_if_needed(cfg, tool, repo_dir, logger):
         msg = f"{tool.name} 初始化失败，无法进入交互任务执行"
         logger.log("round.pause", round_id=round_id, reason=msg, mode="interactive")
-        return RoundResult(
-            status="paused",
-            round_id=round_id,
-            tool_used=tool.name,
-            audit_result=None,
-            commit_status="not_started",
-            commit_hash=None,
-            message=msg,
-        )
+        return _paused_result(round_id, tool.name, msg)
 
     max_turns = max(1, int(interactive_max_turns))
     redo_reason: Optional[str] = None
+    tool_name = tool.name
 
-    for turn in range(1, max_turns + 1):
-        if not refresh_repo_latest_from_remote(cfg, repo_dir, logger):
+    turn = 0
+    while turn < max_turns:
+        turn += 1
+        refreshed, prompt_text = refresh_and_prepare_prompt(cfg, repo_dir, round_id, redo_reason, logger)
+        if not refreshed:
             msg = "交互重试前拉取远端最新代码失败"
             logger.log("round.pause", round_id=round_id, reason=msg, mode="interactive")
-            return RoundResult(
-                status="paused",
-                round_id=round_id,
-                tool_used=tool.name,
-                audit_result=None,
-                commit_status="not_started",
-                commit_hash=None,
-                message=msg,
-            )
-        logger.log("interactive.turn.start", round_id=round_id, turn=turn, tool=tool.name)
-        exec_result, report = run_cli_attempt_interactive(cfg, tool, repo_dir, round_id, redo_reason, logger)
+            return _paused_result(round_id, tool_name, msg)
+        logger.log("interactive.turn.start", round_id=round_id, turn=turn, tool=tool_name)
+        exec_result, report = run_cli_attempt_interactive(
+            cfg, tool, repo_dir, round_id, redo_reason, logger, prompt_text=prompt_text
+        )
 
         if report is None:
             redo_reason = "未检测到有效优化报告（JSON缺失或格式错误）"
-            logger.log("audit.fail", tool=tool.name, reason=redo_reason, turn=turn, mode="interactive")
+            logger.log("audit.fail", tool=tool_name, reason=redo_reason, turn=turn, mode="interactive")
             continue
 
         audit = audit_report(report, cfg.report_min_pass_rate, cfg.strict_require_real_report)
         logger.log(
             "audit.result",
-            tool=tool.name,
+            tool=tool_name,
             approved=audit.approved,
             run_success=audit.run_success,
             test_pass_rate=audit.test_pass_rate,
@@ -1896,25 +2528,19 @@ def run_single_round_interactive(
             if not ok_push:
                 msg = f"提交或推送失败：{push_state}"
                 logger.log("round.pause", round_id=round_id, reason=msg, mode="interactive")
-                return RoundResult(
-                    status="paused",
-                    round_id=round_id,
-                    tool_used=tool.name,
-                    audit_result=audit,
-                    commit_status=push_state,
-                    commit_hash=commit_hash,
-                    message=msg,
+                return _paused_result(
+                    round_id, tool_name, msg, commit_status=push_state, commit_hash=commit_hash, audit=audit
                 )
 
             if push_state == "no_changes" and cfg.require_code_changes:
                 redo_reason = "本轮未产生代码变更（require_code_changes=true）"
-                logger.log("audit.fail", tool=tool.name, reason=redo_reason, turn=turn, mode="interactive", gate="require_code_changes")
+                logger.log("audit.fail", tool=tool_name, reason=redo_reason, turn=turn, mode="interactive", gate="require_code_changes")
                 continue
             if push_state == "docs_only_changes" and cfg.require_non_doc_code_changes:
                 redo_reason = "本轮仅文档/说明性变更（require_non_doc_code_changes=true）"
                 logger.log(
                     "audit.fail",
-                    tool=tool.name,
+                    tool=tool_name,
                     reason=redo_reason,
                     turn=turn,
                     mode="interactive",
@@ -1922,14 +2548,10 @@ def run_single_round_interactive(
                 )
                 continue
             if push_state == "changes_below_threshold" and has_substantive_threshold(cfg):
-                redo_reason = (
-                    "本轮代码改动幅度不足"
-                    f"（minimum_non_doc_files_changed={cfg.minimum_non_doc_files_changed}, "
-                    f"minimum_non_doc_lines_changed={cfg.minimum_non_doc_lines_changed}）"
-                )
+                redo_reason = cfg.threshold_redo_reason
                 logger.log(
                     "audit.fail",
-                    tool=tool.name,
+                    tool=tool_name,
                     reason=redo_reason,
                     turn=turn,
                     mode="interactive",
@@ -1943,36 +2565,36 @@ def run_single_round_interactive(
                 msg = "交互会话审核通过但仅文档变更"
             else:
                 msg = "交互会话审核通过但无代码变更"
-            logger.log("round.success", round_id=round_id, tool=tool.name, commit_status=push_state, mode="interactive")
-            return RoundResult(
-                status="success",
-                round_id=round_id,
-                tool_used=tool.name,
-                audit_result=audit,
-                commit_status=push_state,
-                commit_hash=commit_hash,
-                message=msg,
-            )
+            logger.log("round.success", round_id=round_id, tool=tool_name, commit_status=push_state, mode="interactive")
+            return _success_result(round_id, tool_name, msg, push_state, commit_hash, audit)
 
         redo_reason = audit.reason
-        logger.log("audit.fail", tool=tool.name, reason=audit.reason, turn=turn, mode="interactive")
+        logger.log("audit.fail", tool=tool_name, reason=audit.reason, turn=turn, mode="interactive")
 
     msg = f"交互会话未通过审核，达到最大重做轮次（{max_turns}）"
     logger.log("round.pause", round_id=round_id, reason=msg, mode="interactive")
-    return RoundResult(
-        status="paused",
-        round_id=round_id,
-        tool_used=tool.name,
-        audit_result=None,
-        commit_status="not_started",
-        commit_hash=None,
-        message=msg,
-    )
+    return _paused_result(round_id, tool_name, msg)
+
+
+_SUMMARY_HANDLES: Dict[str, TextIO] = {}
+
+
+def round_summary_handle(log_dir: Path) -> TextIO:
+    # Opened once per log dir and kept for the whole run; line buffering still hands every
+    # summary to the OS immediately, so log_summary.py sees it without waiting for exit.
+    key = str(log_dir)
+    handle = _SUMMARY_HANDLES.get(key)
+    if handle is None or handle.closed:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        handle = open(log_dir / "round_reports.jsonl", "a", encoding="utf-8", buffering=1)
+        _SUMMARY_HANDLES[key] = handle
+        atexit.register(handle.close)
+    return handle
 
 
 def write_round_summary(log_dir: Path, result: RoundResult) -> None:
     out = {
-        "ts": datetime.now(timezone.utc).isoformat(),
+        "ts": utc_now_iso(),
         "round_id": result.round_id,
         "status": result.status,
         "tool_used": result.tool_used,
@@ -1981,12 +2603,10 @@ def write_round_summary(log_dir: Path, result: RoundResult) -> None:
         "message": result.message,
     }
     if result.audit_result:
-        out["audit"] = dataclasses.asdict(result.audit_result)
+        audit = result.audit_result
+        out["audit"] = {name: getattr(audit, name) for name in _AUDIT_FIELDS}
 
-    p = log_dir / "round_reports.jsonl"
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(out, ensure_ascii=False) + "\n")
+    round_summary_handle(log_dir).write(_JSONL_ENCODER.encode(out) + "\n")
 
 
 def clear_pause_reason_file(log_dir: Path) -> None:
@@ -1996,10 +2616,10 @@ def clear_pause_reason_file(log_dir: Path) -> None:
 
 
 def write_pause_reason_file(log_dir: Path, result: RoundResult) -> None:
-    log_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(str(log_dir))
     p = log_dir / "PAUSED_REASON.txt"
     lines = [
-        f"time_utc: {datetime.now(timezone.utc).isoformat()}",
+        f"time_utc: {utc_now_iso()}",
         f"round_id: {result.round_id}",
         f"status: {result.status}",
         f"tool_used: {result.tool_used or 'none'}",
@@ -2011,22 +2631,27 @@ def write_pause_reason_file(log_dir: Path, result: RoundResult) -> None:
         lines.append(f"audit_reason: {result.audit_result.reason}")
         lines.append(f"audit_run_success: {result.audit_result.run_success}")
         lines.append(f"audit_test_pass_rate: {result.audit_result.test_pass_rate:.2f}")
-    p.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    # Publish via rename so anything watching the log dir never reads a partial file.
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp, p)
 
 
 def render_first_round_report(result: RoundResult) -> str:
-    lines = [
-        "# 首轮迭代升级报告",
-        "",
-        f"- 轮次：{result.round_id}",
-        f"- 使用CLI工具：{result.tool_used or '无'}",
-        f"- 审核结果：{result.audit_result.reason if result.audit_result else '未完成'}",
-        f"- 测试通过率：{(f'{result.audit_result.test_pass_rate:.2f}%') if result.audit_result else 'N/A'}",
-        f"- 提交状态：{result.commit_status}",
-        f"- 提交哈希：{result.commit_hash or 'N/A'}",
-        f"- 备注：{result.message}",
-    ]
-    return "\n".join(lines)
+    ar = result.audit_result
+    reason = ar.reason if ar else "未完成"
+    rate = f"{ar.test_pass_rate:.2f}%" if ar else "N/A"
+    return (
+        "# 首轮迭代升级报告\n"
+        "\n"
+        f"- 轮次：{result.round_id}\n"
+        f"- 使用CLI工具：{result.tool_used or '无'}\n"
+        f"- 审核结果：{reason}\n"
+        f"- 测试通过率：{rate}\n"
+        f"- 提交状态：{result.commit_status}\n"
+        f"- 提交哈希：{result.commit_hash or 'N/A'}\n"
+        f"- 备注：{result.message}"
+    )
 
 
 def run_single_round(
@@ -2041,23 +2666,19 @@ def run_single_round(
     if not ok:
         msg = f"仓库同步失败: {reason}"
         logger.log("round.pause", round_id=round_id, reason=msg)
-        return RoundResult(
-            status="paused",
-            round_id=round_id,
-            tool_used=None,
-            audit_result=None,
-            commit_status="not_started",
-            commit_hash=None,
-            message=msg,
-        )
+        return _paused_result(round_id, None, msg)
+
+    # ensure_repo_synced just reset and cleaned the tree, so the first tool can skip its refresh.
+    workspace_fresh = True
 
     # Try CLI tools by priority.
     for tool in cfg.cli_tools:
         if not tool.enabled:
             continue
-        if not refresh_repo_latest_from_remote(cfg, repo_dir, logger):
+        if not workspace_fresh and not refresh_repo_latest_from_remote(cfg, repo_dir, logger):
             logger.log("cli.switch", from_tool=tool.name, reason="repo_refresh_failed")
             continue
+        workspace_fresh = False
         if not run_cli_init_if_needed(cfg, tool, repo_dir, logger):
             logger.log("cli.switch", from_tool=tool.name, reason="init_failed")
             continue
@@ -2066,7 +2687,8 @@ def run_single_round(
         redo_reason: Optional[str] = None
 
         while audit_failures < cfg.max_audit_failures_per_cli:
-            if not refresh_repo_latest_from_remote(cfg, repo_dir, logger):
+            refreshed, prompt_text = refresh_and_prepare_prompt(cfg, repo_dir, round_id, redo_reason, logger)
+            if not refreshed:
                 logger.log("cli.call_failed", tool=tool.name, reason="repo_refresh_failed", exit_code=None, error_keyword=None)
                 break
             exec_result, report = run_cli_attempt(
@@ -2077,6 +2699,7 @@ def run_single_round(
                 audit_failures + 1,
                 redo_reason,
                 logger,
+                prompt_text=prompt_text,
             )
 
             call_failure = (
@@ -2124,14 +2747,8 @@ def run_single_round(
                 if not ok_push:
                     msg = f"提交或推送失败：{push_state}"
                     logger.log("round.pause", round_id=round_id, reason=msg)
-                    return RoundResult(
-                        status="paused",
-                        round_id=round_id,
-                        tool_used=tool.name,
-                        audit_result=audit,
-                        commit_status=push_state,
-                        commit_hash=commit_hash,
-                        message=msg,
+                    return _paused_result(
+                        round_id, tool.name, msg, commit_status=push_state, commit_hash=commit_hash, audit=audit
                     )
 
                 if push_state == "no_changes" and cfg.require_code_changes:
@@ -2158,11 +2775,7 @@ def run_single_round(
                     continue
                 if push_state == "changes_below_threshold" and has_substantive_threshold(cfg):
                     audit_failures += 1
-                    redo_reason = (
-                        "本轮代码改动幅度不足"
-                        f"（minimum_non_doc_files_changed={cfg.minimum_non_doc_files_changed}, "
-                        f"minimum_non_doc_lines_changed={cfg.minimum_non_doc_lines_changed}）"
-                    )
+                    redo_reason = cfg.threshold_redo_reason
                     logger.log(
                         "audit.fail",
                         tool=tool.name,
@@ -2178,15 +2791,7 @@ def run_single_round(
                     msg = "审核通过但仅文档变更"
                 else:
                     msg = "审核通过但无代码变更"
-                rr = RoundResult(
-                    status="success",
-                    round_id=round_id,
-                    tool_used=tool.name,
-                    audit_result=audit,
-                    commit_status=push_state,
-                    commit_hash=commit_hash,
-                    message=msg,
-                )
+                rr = _success_result(round_id, tool.name, msg, push_state, commit_hash, audit)
                 logger.log("round.success", round_id=round_id, tool=tool.name, commit_status=push_state)
                 return rr
 
@@ -2209,15 +2814,7 @@ def run_single_round(
     # All CLIs failed/unavailable.
     msg = "无可用AI CLI工具（全部调用失败/挂起/审核不通过）"
     logger.log("round.pause", round_id=round_id, reason=msg)
-    return RoundResult(
-        status="paused",
-        round_id=round_id,
-        tool_used=None,
-        audit_result=None,
-        commit_status="not_started",
-        commit_hash=None,
-        message=msg,
-    )
+    return _paused_result(round_id, None, msg)
 
 
 def parse_args() -> argparse.Namespace:
@@ -2238,21 +2835,30 @@ def parse_args() -> argparse.Namespace:
 
 
 def filter_available_cli_tools(cfg: RuntimeConfig, logger: EventLogger) -> None:
-    kept: List[CLIConfig] = []
+    candidates: List[Tuple[CLIConfig, str]] = []
     for tool in cfg.cli_tools:
         if not tool.enabled:
             logger.log("cli.disabled", tool=tool.name)
             continue
-        try:
-            parts = shlex.split(tool.command)
-        except ValueError:
+        parts = tool.argv
+        if parts is None:
             logger.log("cli.command_parse_failed", tool=tool.name, command=tool.command)
             continue
         if not parts:
             logger.log("cli.command_empty", tool=tool.name)
             continue
-        binary = parts[0]
-        if shutil.which(binary) is None:
+        candidates.append((tool, parts[0]))
+
+    # PATH lookups are independent stat sweeps; run them concurrently, once per distinct binary.
+    binaries = list(dict.fromkeys(binary for _, binary in candidates))
+    found: Dict[str, bool] = {}
+    if binaries:
+        with ThreadPoolExecutor(max_workers=min(8, len(binaries))) as pool:
+            found = dict(zip(binaries, pool.map(lambda b: shutil.which(b) is not None, binaries)))
+
+    kept: List[CLIConfig] = []
+    for tool, binary in candidates:
+        if not found[binary]:
             logger.log("cli.binary_missing", tool=tool.name, binary=binary)
             continue
         kept.append(tool)
@@ -2268,14 +2874,17 @@ def apply_cli_preferences(
     if not cli_order_spec and not only_cli_spec:
         return
 
-    selected = list(cfg.cli_tools)
+    selected = cfg.cli_tools
     all_names = [tool.name for tool in selected]
 
     if only_cli_spec:
         wanted, unknown = resolve_cli_names(split_csv(only_cli_spec), all_names)
         if unknown:
             logger.log("cli.only.unknown", requested=unknown)
-        if wanted:
+        if wanted == all_names:
+            # Selecting every tool in its current order changes nothing.
+            logger.log("cli.only.applied", order=all_names)
+        elif wanted:
             by_name = {tool.name: tool for tool in selected}
             selected = [by_name[name] for name in wanted if name in by_name]
             logger.log("cli.only.applied", order=[tool.name for tool in selected])
@@ -2288,7 +2897,10 @@ def apply_cli_preferences(
         ordered_names, unknown = resolve_cli_names(split_csv(cli_order_spec), selected_names)
         if unknown:
             logger.log("cli.order.unknown", requested=unknown)
-        if ordered_names:
+        if ordered_names and ordered_names == selected_names[: len(ordered_names)]:
+            # Requested order is already a prefix of the current order.
+            logger.log("cli.order.applied", order=selected_names)
+        elif ordered_names:
             by_name = {tool.name: tool for tool in selected}
             ordered_set = set(ordered_names)
             selected = [by_name[name] for name in ordered_names if name in by_name] + [
@@ -2299,6 +2911,16 @@ def apply_cli_preferences(
     cfg.cli_tools = selected
 
 
+# Set from the SIGUSR1 handler so an operator can start the next round without waiting out the interval.
+_WAKE = threading.Event()
+
+
+def install_wake_signal() -> None:
+    sig = getattr(signal, "SIGUSR1", None)
+    if sig is not None:
+        signal.signal(sig, lambda *_: _WAKE.set())
+
+
 def main() -> int:
     args = parse_args()
     cfg = load_config(Path(args.config).resolve())
@@ -2329,6 +2951,9 @@ def main() -> int:
     logger = EventLogger(cfg.log_dir / "openclaw_runner.log", secret_mask=token)
 
     logger.log("system.start", config_path=str(Path(args.config).resolve()))
+    install_wake_signal()
+    if cfg.commit_template_error is not None:
+        logger.log("git.commit_template_invalid", template=cfg.rejected_commit_template, error=cfg.commit_template_error)
     apply_cli_preferences(cfg, args.cli_order, args.only_cli, logger)
     filter_available_cli_tools(cfg, logger)
     logger.log("cli.available_set", tools=[t.name for t in cfg.cli_tools])
@@ -2385,7 +3010,9 @@ def main() -> int:
             return 4
 
         logger.log("round.sleep", seconds=cfg.loop_interval_seconds)
-        time.sleep(cfg.loop_interval_seconds)
+        if _WAKE.wait(cfg.loop_interval_seconds):
+            _WAKE.clear()
+            logger.log("round.wake", reason="SIGUSR1")
         round_id += 1
 
 
@@ -4,12 +4,16 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import importlib.util
 import json
+import os
 import shlex
 import shutil
 import stat
 import subprocess
 import sys
+import traceback
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List
@@ -47,7 +51,8 @@ def repo_name_from_url(repo_url: str) -> str:
     return name[:-4] if name.endswith(".git") else name
 
 
-def parse_args() -> argparse.Namespace:
+@functools.lru_cache(maxsize=1)
+def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Deploy OpenClaw autopilot templates")
     p.add_argument("--output-dir", required=True, help="Target directory")
     p.add_argument(
@@ -154,12 +159,46 @@ def parse_args() -> argparse.Namespace:
     )
     p.add_argument("--force", action="store_true", help="Overwrite existing files")
     p.set_defaults(fallback_run_tests=None)
-    return p.parse_args()
+    return p
+
+
+def parse_args() -> argparse.Namespace:
+    return build_parser().parse_args()
+
+
+def scandir_names(directory: Path) -> Dict[str, str]:
+    try:
+        with os.scandir(directory) as it:
+            return {entry.name: entry.path for entry in it}
+    except FileNotFoundError:
+        return {}
 
 
 def set_executable(path: Path) -> None:
     mode = path.stat().st_mode
-    path.chmod(mode | stat.S_IXUSR)
+    # copy2 already carries the source mode over, so this is usually a no-op.
+    if not mode & stat.S_IXUSR:
+        path.chmod(mode | stat.S_IXUSR)
+
+
+@functools.lru_cache(maxsize=None)
+def _binary_of(command: str) -> str:
+    c = command.strip()
+    # Without quotes or escapes, shlex would just split on whitespace; skip the lexer.
+    if "'" not in c and '"' not in c and "\\" not in c:
+        head = c.split(None, 1)
+        return head[0] if head else ""
+    try:
+        parts = shlex.split(c)
+    except ValueError:
+        return ""
+    return parts[0] if parts else ""
+
+
+@functools.lru_cache(maxsize=None)
+def _which(binary: str) -> str | None:
+    # discover_clis runs twice per deploy (auto-disable, then the summary); walk PATH once.
+    return shutil.which(binary)
 
 
 def discover_clis(config: Dict[str, object]) -> List[CLIDiscovery]:
@@ -171,18 +210,13 @@ def discover_clis(config: Dict[str, object]) -> List[CLIDiscovery]:
         if not isinstance(item, dict):
             continue
         command = str(item.get("command", "")).strip()
-        parts: List[str] = []
-        try:
-            parts = shlex.split(command)
-        except ValueError:
-            parts = []
-        binary = parts[0] if parts else ""
+        binary = _binary_of(command)
         rows.append(
             CLIDiscovery(
                 name=str(item.get("name", "Unnamed CLI")),
                 command=command,
                 binary=binary,
-                available=bool(binary) and (shutil.which(binary) is not None),
+                available=bool(binary) and (_which(binary) is not None),
             )
         )
     return rows
@@ -195,13 +229,22 @@ def split_csv(raw: str | None) -> List[str]:
 
 
 def resolve_cli_names(tokens: List[str], available_names: List[str]) -> tuple[List[str], List[str]]:
-    by_lower = {name.lower(): name for name in available_names}
+    if not tokens:
+        return [], []
+    # Aliases cover the usual codex/gemini/open-code/claude spellings; only build the
+    # configured-name table when a token misses them.
+    by_lower: Dict[str, str] | None = None
     resolved: List[str] = []
     unknown: List[str] = []
     seen: set[str] = set()
     for token in tokens:
-        key = token.strip().lower()
-        target = CLI_ALIAS_MAP.get(key) or by_lower.get(key)
+        # Tokens come from split_csv, which already strips them.
+        key = token.lower()
+        target = CLI_ALIAS_MAP.get(key)
+        if target is None:
+            if by_lower is None:
+                by_lower = {name.lower(): name for name in available_names}
+            target = by_lower.get(key)
         if not target:
             unknown.append(token)
             continue
@@ -278,7 +321,12 @@ def apply_config_overrides(config: Dict[str, object], args: argparse.Namespace)
 
     cli_tools = config.get("cli_tools", [])
     if isinstance(cli_tools, list):
-        all_names = [str(item.get("name", "")) for item in cli_tools if isinstance(item, dict)]
+        # Index the dict entries once; both --only-cli and --cli-order work off these.
+        entries = [item for item in cli_tools if isinstance(item, dict)]
+        all_names = [str(item.get("name", "")) for item in entries]
+        by_name = dict(zip(all_names, entries))
+        order = entries
+        order_names = all_names
 
         if args.only_cli:
             wanted, unknown = resolve_cli_names(split_csv(args.only_cli), all_names)
@@ -286,33 +334,36 @@ def apply_config_overrides(config: Dict[str, object], args: argparse.Namespace)
                 print(f"WARNING: unknown --only-cli value(s): {', '.join(unknown)}")
             if wanted:
                 wanted_set = set(wanted)
-                by_name = {str(item.get("name", "")): item for item in cli_tools if isinstance(item, dict)}
                 enabled_front = [by_name[name] for name in wanted if name in by_name]
-                rest = [item for item in cli_tools if isinstance(item, dict) and str(item.get("name", "")) not in wanted_set]
+                rest = [item for item, name in zip(entries, all_names) if name not in wanted_set]
                 for entry in enabled_front:
                     entry["enabled"] = True
                 for entry in rest:
                     entry["enabled"] = False
-                cli_tools = enabled_front + rest
+                order = enabled_front + rest
+                order_names = [name for name in wanted if name in by_name] + [
+                    name for name in all_names if name not in wanted_set
+                ]
+                cli_tools = order
                 print(f"Applied --only-cli: {', '.join(wanted)}")
             else:
-                for entry in cli_tools:
-                    if isinstance(entry, dict):
-                        entry["enabled"] = False
+                for entry in entries:
+                    entry["enabled"] = False
                 print("WARNING: --only-cli had no valid CLI names; all CLI entries are disabled")
 
         if args.cli_order:
-            current_names = [str(item.get("name", "")) for item in cli_tools if isinstance(item, dict)]
-            ordered_names, unknown = resolve_cli_names(split_csv(args.cli_order), current_names)
+            ordered_names, unknown = resolve_cli_names(split_csv(args.cli_order), order_names)
             if unknown:
                 print(f"WARNING: unknown --cli-order value(s): {', '.join(unknown)}")
             if ordered_names:
                 ordered_set = set(ordered_names)
-                by_name = {str(item.get("name", "")): item for item in cli_tools if isinstance(item, dict)}
                 front = [by_name[name] for name in ordered_names if name in by_name]
-                rest = [item for item in cli_tools if isinstance(item, dict) and str(item.get("name", "")) not in ordered_set]
+                rest = [item for item, name in zip(order, order_names) if name not in ordered_set]
                 cli_tools = front + rest
-                print(f"Applied --cli-order: {', '.join([str(item.get('name', '')) for item in cli_tools if isinstance(item, dict)])}")
+                final_names = [name for name in ordered_names if name in by_name] + [
+                    name for name in order_names if name not in ordered_set
+                ]
+                print(f"Applied --cli-order: {', '.join(final_names)}")
         config["cli_tools"] = cli_tools
 
     if args.auto_disable_missing_clis:
@@ -372,19 +423,34 @@ def run_doctor_after_deploy(output_dir: Path) -> int:
         print("Doctor run skipped: openclaw_config.json not found")
         return 0
 
-    cmd = [sys.executable, str(doctor), "--config", str(config)]
     print("\nRunning post-deploy doctor:")
-    print(" ".join(shlex.quote(x) for x in cmd))
-    proc = subprocess.run(
-        cmd,
-        cwd=str(output_dir),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-    )
-    if proc.stdout:
-        print(proc.stdout.rstrip())
-    return proc.returncode
+    # Run the deployed doctor in this interpreter instead of paying for a second startup.
+    spec = importlib.util.spec_from_file_location("deployed_doctor_autopilot", doctor)
+    if spec is None or spec.loader is None:
+        cmd = [sys.executable, str(doctor), "--config", str(config)]
+        print(shlex.join(cmd))
+        return subprocess.run(cmd, cwd=str(output_dir)).returncode
+    print(f"running doctor in-process: {shlex.quote(str(doctor))} --config {shlex.quote(str(config))}")
+    module = importlib.util.module_from_spec(spec)
+    saved_argv = sys.argv
+    saved_cwd = os.getcwd()
+    sys.argv = [str(doctor), "--config", str(config)]
+    # dataclasses resolves the module through sys.modules while the class body executes.
+    sys.modules[spec.name] = module
+    try:
+        os.chdir(output_dir)
+        spec.loader.exec_module(module)
+        return int(module.main())
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:  # noqa: BLE001
+        # Same outcome as the child interpreter crashing: show the traceback, exit 1.
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.modules.pop(spec.name, None)
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
 
 
 def main() -> int:
@@ -397,43 +463,53 @@ def main() -> int:
     output_dir = Path(args.output_dir).resolve()
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    missing = [name for name in TEMPLATE_FILES if not (templates_dir / name).exists()]
+    # One directory listing each instead of a stat per template for presence/overwrite checks.
+    present = scandir_names(templates_dir)
+    missing = [name for name in TEMPLATE_FILES if name not in present]
     if missing:
         raise FileNotFoundError(f"Missing template files: {', '.join(missing)}")
+    existing = scandir_names(output_dir)
 
     for name in TEMPLATE_FILES:
-        src = templates_dir / name
         dst = output_dir / name
-        if dst.exists() and not args.force:
+        if name in existing and not args.force:
             raise FileExistsError(f"File exists (use --force): {dst}")
-        shutil.copy2(src, dst)
+        shutil.copy2(present[name], dst)
 
     doctor_src = skill_dir / "scripts" / "doctor_autopilot.py"
     doctor_dst = output_dir / "doctor_autopilot.py"
+    doctor_present = doctor_dst.name in existing
     if doctor_src.exists():
-        if doctor_dst.exists() and not args.force:
+        if doctor_present and not args.force:
             raise FileExistsError(f"File exists (use --force): {doctor_dst}")
         shutil.copy2(doctor_src, doctor_dst)
+        doctor_present = True
 
     config_path = output_dir / "openclaw_config.json"
     config_src = output_dir / "openclaw_config.json"
     if args.config_profile == "production":
         config_src = output_dir / "openclaw_config.production.json"
-    config = json.loads(config_src.read_text(encoding="utf-8"))
+    source_text = config_src.read_text(encoding="utf-8")
+    config = json.loads(source_text)
+    # A second parse is the cheapest deep copy to diff the overrides against.
+    baseline = json.loads(source_text) if config_src == config_path else None
     config = apply_config_overrides(config, args)
-    config_path.write_text(json.dumps(config, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-
-    set_executable(output_dir / "openclaw_autopilot.py")
-    set_executable(output_dir / "start_openclaw.sh")
-    if doctor_dst.exists():
-        set_executable(doctor_dst)
+    # copy2 already put the default template in place; only rewrite when something changed.
+    if baseline is None or config != baseline:
+        config_path.write_text(json.dumps(config, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    executables = [output_dir / "openclaw_autopilot.py", output_dir / "start_openclaw.sh"]
+    if doctor_present:
+        executables.append(doctor_dst)
+    for path in executables:
+        set_executable(path)
     if args.init_env:
         maybe_init_env(output_dir)
 
     print("Deployed files:")
     for name in TEMPLATE_FILES:
         print(f"- {output_dir / name}")
-    if doctor_dst.exists():
+    if doctor_present:
         print(f"- {doctor_dst}")
     print_cli_discovery(config)
     print("\nNext steps:")
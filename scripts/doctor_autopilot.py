@@ -4,25 +4,36 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
 import json
 import os
+import re
 import shlex
 import shutil
 import subprocess
-from dataclasses import dataclass, asdict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
-from urllib import error as urlerror
-from urllib import request as urlrequest
+from typing import Any, Dict, List, Optional
 
 
-@dataclass
+VERSION_CACHE_PATH = Path.home() / ".cache" / "openclaw-doctor" / "versions.json"
+RESULT_CACHE_DIR = VERSION_CACHE_PATH.parent / "results"
+
+
+@dataclass(slots=True)
 class CheckItem:
     name: str
     ok: bool
     detail: str
     level: str = "info"
 
+    def as_dict(self) -> Dict[str, Any]:
+        # Flat fields only, so skip the recursive deepcopy that dataclasses.asdict does.
+        return {"name": self.name, "ok": self.ok, "detail": self.detail, "level": self.level}
+
 
 def run_cmd(cmd: List[str], timeout: int = 15) -> tuple[int, str]:
     try:
@@ -38,38 +49,45 @@ def run_cmd(cmd: List[str], timeout: int = 15) -> tuple[int, str]:
         return 124, f"timeout after {timeout}s"
 
 
+# Node prints deprecation noise ahead of the real `--version` / status line.
+_NOISE_LINE_RE = re.compile(r"deprecationwarning|trace-deprecation|^\(node:", re.IGNORECASE)
+
+
 def first_meaningful_line(text: str) -> str:
-    for line in text.splitlines():
+    lines = text.splitlines()
+    noise = _NOISE_LINE_RE.search
+    for line in lines:
         s = line.strip()
-        if not s:
-            continue
-        lower = s.lower()
-        if "deprecationwarning" in lower:
-            continue
-        if "trace-deprecation" in lower:
-            continue
-        if lower.startswith("(node:"):
-            continue
-        return s
-    return text.splitlines()[0].strip() if text.splitlines() else ""
+        if s and not noise(s):
+            return s
+    return lines[0].strip() if lines else ""
 
 
 def load_config(path: Path) -> Dict[str, Any]:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+REQUIRED_CONFIG_KEYS = ("repo_url", "branch", "cli_tools", "timeouts", "report_min_pass_rate")
+
+
 def check_config_keys(cfg: Dict[str, Any]) -> List[CheckItem]:
-    required = ["repo_url", "branch", "cli_tools", "timeouts", "report_min_pass_rate"]
-    out: List[CheckItem] = []
-    for key in required:
-        ok = key in cfg
-        out.append(CheckItem(name=f"config.key.{key}", ok=ok, detail="present" if ok else "missing", level="error"))
+    missing = set(REQUIRED_CONFIG_KEYS).difference(cfg.keys())
+    out: List[CheckItem] = [
+        CheckItem(
+            name=f"config.key.{key}",
+            ok=key not in missing,
+            detail="missing" if key in missing else "present",
+            level="error",
+        )
+        for key in REQUIRED_CONFIG_KEYS
+    ]
     cli_tools = cfg.get("cli_tools", [])
+    tools_ok = isinstance(cli_tools, list)
     out.append(
         CheckItem(
             name="config.cli_tools.type",
-            ok=isinstance(cli_tools, list),
-            detail=f"type={type(cli_tools).__name__}",
+            ok=tools_ok,
+            detail="type=list" if tools_ok else f"type={type(cli_tools).__name__}",
             level="error",
         )
     )
@@ -86,36 +104,142 @@ def check_config_keys(cfg: Dict[str, Any]) -> List[CheckItem]:
     return out
 
 
-def check_cli_binaries(cfg: Dict[str, Any]) -> List[CheckItem]:
-    out: List[CheckItem] = []
+@functools.lru_cache(maxsize=None)
+def _binary_of(command: str) -> str:
+    c = command.strip()
+    # Without quotes or escapes, shlex would just split on whitespace; skip the lexer.
+    if "'" not in c and '"' not in c and "\\" not in c:
+        head = c.split(None, 1)
+        return head[0] if head else ""
+    try:
+        parts = shlex.split(c)
+    except ValueError:
+        return ""
+    return parts[0] if parts else ""
+
+
+@functools.lru_cache(maxsize=None)
+def _which(binary: str) -> str | None:
+    # check_cli_binaries and check_known_logins both look up codex/gemini.
+    return shutil.which(binary)
+
+
+def load_version_cache() -> Dict[str, Any]:
+    try:
+        data = json.loads(VERSION_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_version_cache(cache: Dict[str, Any]) -> None:
+    try:
+        VERSION_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = VERSION_CACHE_PATH.with_name(VERSION_CACHE_PATH.name + ".tmp")
+        tmp.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, VERSION_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def probe_version(binary: str, cache: Optional[Dict[str, Any]]) -> tuple[int, str]:
+    # `--version` spawns (often node) processes; reuse the last answer until the binary changes.
+    resolved = os.path.realpath(_which(binary) or binary)
+    try:
+        st = os.stat(resolved)
+        stamp = f"{st.st_mtime_ns}:{st.st_size}"
+    except OSError:
+        stamp = ""
+    hit = cache.get(resolved) if (cache is not None and stamp) else None
+    if isinstance(hit, dict) and hit.get("stamp") == stamp:
+        return int(hit.get("code", 1)), str(hit.get("output", ""))
+    code, out = run_cmd([binary, "--version"], timeout=10)
+    if cache is not None and stamp and code != 124:
+        cache[resolved] = {"stamp": stamp, "code": code, "output": out[:2000]}
+    return code, out
+
+
+def result_cache_key(cfg_bytes: bytes, token: str, args: argparse.Namespace) -> str:
+    # Everything that can change the outcome without a TTL expiring: config content, token,
+    # PATH (which binaries are found) and the flags that select checks.
+    h = hashlib.blake2b(digest_size=16)
+    for part in (
+        cfg_bytes,
+        token.encode("utf-8"),
+        os.environ.get("PATH", "").encode("utf-8"),
+        repr((args.check_github_token, args.skip_version_probe, args.skip_login_checks)).encode("utf-8"),
+    ):
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.hexdigest()
+
+
+def load_cached_items(key: str, ttl_seconds: int) -> Optional[tuple[List[CheckItem], float]]:
+    path = RESULT_CACHE_DIR / f"{key}.json"
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        age = time.time() - float(data["saved_at"])
+        if not 0 <= age < ttl_seconds:
+            return None
+        return [CheckItem(**item) for item in data["items"]], age
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+
+def save_cached_items(key: str, items: List[CheckItem]) -> None:
+    path = RESULT_CACHE_DIR / f"{key}.json"
+    try:
+        RESULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"saved_at": time.time(), "items": [x.as_dict() for x in items]}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def check_cli_binaries(
+    cfg: Dict[str, Any],
+    probe_versions: bool = True,
+    version_cache: Optional[Dict[str, Any]] = None,
+) -> List[CheckItem]:
     cli_tools = cfg.get("cli_tools", [])
     if not isinstance(cli_tools, list):
         return [CheckItem(name="cli_tools.invalid", ok=False, detail="cli_tools is not list", level="error")]
 
+    rows: List[tuple[CheckItem, str, str]] = []
     for item in cli_tools:
         if not isinstance(item, dict):
             continue
         name = str(item.get("name", "Unnamed CLI"))
         cmd = str(item.get("command", "")).strip()
         enabled = bool(item.get("enabled", True))
-        try:
-            parts = shlex.split(cmd)
-        except ValueError:
-            parts = []
-        binary = parts[0] if parts else ""
-        exists = bool(binary) and (shutil.which(binary) is not None)
+        binary = _binary_of(cmd)
+        exists = bool(binary) and (_which(binary) is not None)
         lvl = "error" if enabled else "warning"
-        out.append(
-            CheckItem(
-                name=f"cli.binary.{name}",
-                ok=(exists or not enabled),
-                detail=f"enabled={enabled}, binary={binary or 'N/A'}, found={exists}",
-                level=lvl,
-            )
+        binary_item = CheckItem(
+            name=f"cli.binary.{name}",
+            ok=(exists or not enabled),
+            detail=f"enabled={enabled}, binary={binary or 'N/A'}, found={exists}",
+            level=lvl,
         )
+        rows.append((binary_item, name, binary if (exists and probe_versions) else ""))
+
+    # Version probes are independent subprocess spawns; run them side by side, once per binary.
+    probe_binaries = list(dict.fromkeys(binary for _, _, binary in rows if binary))
+    versions: Dict[str, tuple[int, str]] = {}
+    if probe_binaries:
+        with ThreadPoolExecutor(max_workers=len(probe_binaries)) as pool:
+            results = pool.map(lambda b: probe_version(b, version_cache), probe_binaries)
+            versions = dict(zip(probe_binaries, results))
 
-        if exists:
-            code, version_out = run_cmd([binary, "--version"], timeout=10)
+    out: List[CheckItem] = []
+    for binary_item, name, binary in rows:
+        out.append(binary_item)
+        if binary:
+            code, version_out = versions[binary]
             first = first_meaningful_line(version_out)[:200] if version_out else ""
             out.append(
                 CheckItem(
@@ -131,14 +255,14 @@ def check_cli_binaries(cfg: Dict[str, Any]) -> List[CheckItem]:
 def check_known_logins() -> List[CheckItem]:
     out: List[CheckItem] = []
 
-    if shutil.which("codex"):
+    if _which("codex"):
         # Override local config edge cases (for example invalid model_reasoning_effort)
         # so login checks do not produce false warnings.
         code, text = run_cmd(["codex", "-c", "model_reasoning_effort=high", "login", "status"], timeout=10)
         ok = code == 0 and ("logged in" in text.lower())
         out.append(CheckItem(name="login.codex", ok=ok, detail=text[:200], level="warning"))
 
-    if shutil.which("gemini"):
+    if _which("gemini"):
         code, text = run_cmd(["gemini", "--list-sessions"], timeout=20)
         ok = code == 0
         first = first_meaningful_line(text)[:200] if text else ""
@@ -148,6 +272,10 @@ def check_known_logins() -> List[CheckItem]:
 
 
 def check_github_token(token: str) -> CheckItem:
+    # urllib.request pulls in http.client/ssl/email (~60 ms); only pay for it when asked.
+    from urllib import error as urlerror
+    from urllib import request as urlrequest
+
     req = urlrequest.Request(
         "https://api.github.com/user",
         headers={
@@ -167,25 +295,67 @@ def check_github_token(token: str) -> CheckItem:
         return CheckItem(name="token.github", ok=False, detail=f"request_failed:{e}", level="error")
 
 
-def summarize(items: List[CheckItem]) -> Dict[str, Any]:
-    errors = [x for x in items if (not x.ok and x.level == "error")]
-    warnings = [x for x in items if (not x.ok and x.level == "warning")]
-    return {
-        "ok": len(errors) == 0,
-        "errors": len(errors),
-        "warnings": len(warnings),
-        "items": [asdict(x) for x in items],
+def summarize(items: List[CheckItem], include_items: bool = True) -> Dict[str, Any]:
+    errors = sum(1 for x in items if (not x.ok and x.level == "error"))
+    warnings = sum(1 for x in items if (not x.ok and x.level == "warning"))
+    out: Dict[str, Any] = {
+        "ok": errors == 0,
+        "errors": errors,
+        "warnings": warnings,
     }
+    if include_items:
+        out["items"] = [x.as_dict() for x in items]
+    return out
 
 
-def parse_args() -> argparse.Namespace:
+@functools.lru_cache(maxsize=1)
+def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Doctor for OpenClaw autopilot")
     p.add_argument("--config", default="openclaw_config.json", help="Path to config JSON")
     p.add_argument("--token-env", default="GITHUB_TOKEN", help="Env var name for GitHub token")
     p.add_argument("--check-github-token", action="store_true", help="Validate GitHub token via API")
     p.add_argument("--json", action="store_true", help="Output machine-readable JSON")
     p.add_argument("--strict", action="store_true", help="Return non-zero when warnings exist")
-    return p.parse_args()
+    p.add_argument("--skip-version-probe", action="store_true", help="Only check CLI binaries exist; skip `--version` probes")
+    p.add_argument("--skip-login-checks", action="store_true", help="Skip Codex/Gemini login status checks")
+    p.add_argument("--no-version-cache", action="store_true", help=f"Always re-run `--version` probes instead of using {VERSION_CACHE_PATH}")
+    p.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=0,
+        help="Reuse a full result for the same config/token/PATH if younger than N seconds (default 0: off)",
+    )
+    return p
+
+
+def parse_args() -> argparse.Namespace:
+    return build_parser().parse_args()
+
+
+def run_checks(cfg: Dict[str, Any], args: argparse.Namespace, token_val: str) -> List[CheckItem]:
+    items: List[CheckItem] = []
+    items.extend(check_config_keys(cfg))
+    version_cache = None if args.no_version_cache else load_version_cache()
+
+    # The remaining checks are subprocess/network bound and independent; overlap them and
+    # collect results in the original order.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        binaries_f = pool.submit(
+            check_cli_binaries, cfg, probe_versions=not args.skip_version_probe, version_cache=version_cache
+        )
+        logins_f = None if args.skip_login_checks else pool.submit(check_known_logins)
+        token_f = pool.submit(check_github_token, token_val) if (args.check_github_token and token_val) else None
+        items.extend(binaries_f.result())
+        if logins_f is not None:
+            items.extend(logins_f.result())
+        if token_f is not None:
+            items.append(token_f.result())
+
+    if version_cache is not None and not args.skip_version_probe:
+        save_version_cache(version_cache)
+    if args.check_github_token and not token_val:
+        items.append(CheckItem(name="token.github", ok=False, detail=f"env {args.token_env} is empty", level="error"))
+    return items
 
 
 def main() -> int:
@@ -197,28 +367,29 @@ def main() -> int:
         return 2
 
     cfg = load_config(cfg_path)
+    token_val = os.environ.get(args.token_env, "").strip()
 
-    items: List[CheckItem] = []
-    items.extend(check_config_keys(cfg))
-    items.extend(check_cli_binaries(cfg))
-    items.extend(check_known_logins())
-
-    token_val = os.environ.get(args.token_env, "")
-    if args.check_github_token:
-        if token_val:
-            items.append(check_github_token(token_val.strip()))
-        else:
-            items.append(CheckItem(name="token.github", ok=False, detail=f"env {args.token_env} is empty", level="error"))
+    cache_key = result_cache_key(cfg_path.read_bytes(), token_val, args) if args.cache_ttl > 0 else None
+    cached = load_cached_items(cache_key, args.cache_ttl) if cache_key else None
+    if cached is not None:
+        items, age = cached
+        cached_note = f" (cached {int(age)}s ago)"
+    else:
+        items = run_checks(cfg, args, token_val)
+        cached_note = ""
+        if cache_key:
+            save_cached_items(cache_key, items)
 
-    result = summarize(items)
+    # Text output reads the CheckItems directly; only JSON needs the per-item dicts.
+    result = summarize(items, include_items=args.json)
 
     if args.json:
         print(json.dumps(result, ensure_ascii=False, indent=2))
     else:
-        print(f"Doctor result: ok={result['ok']} errors={result['errors']} warnings={result['warnings']}")
-        for item in result["items"]:
-            state = "OK" if item["ok"] else item["level"].upper()
-            print(f"- [{state}] {item['name']}: {item['detail']}")
+        print(f"Doctor result: ok={result['ok']} errors={result['errors']} warnings={result['warnings']}{cached_note}")
+        for item in items:
+            state = "OK" if item.ok else item.level.upper()
+            print(f"- [{state}] {item.name}: {item.detail}")
 
     if not result["ok"]:
         return 3
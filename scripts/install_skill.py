@@ -4,9 +4,20 @@
 from __future__ import annotations
 
 import argparse
+import fnmatch
 import os
+import re
 import shutil
 from pathlib import Path
+from typing import Iterable, Set
+
+IGNORE_PATTERNS = (".git", "__pycache__", "*.pyc", ".DS_Store")
+# One alternation instead of an fnmatch.filter() pass per pattern per directory.
+# Case-folds like fnmatch does on case-insensitive platforms (Windows).
+_IGNORE_RE = re.compile(
+    "|".join(fnmatch.translate(p) for p in IGNORE_PATTERNS),
+    re.IGNORECASE if os.path.normcase("A") == "a" else 0,
+)
 
 
 def default_target_root() -> Path:
@@ -16,6 +27,11 @@ def default_target_root() -> Path:
     return Path.home() / ".codex" / "skills"
 
 
+def ignore_entries(_dir: str, names: Iterable[str]) -> Set[str]:
+    match = _IGNORE_RE.match
+    return {name for name in names if match(name)}
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Install openclaw-cortexnet-autopilot skill locally")
     p.add_argument("--target-root", default=None, help="Target skills root (default: $CODEX_HOME/skills or ~/.codex/skills)")
@@ -44,7 +60,7 @@ def main() -> int:
     shutil.copytree(
         skill_root,
         dest,
-        ignore=shutil.ignore_patterns(".git", "__pycache__", "*.pyc", ".DS_Store"),
+        ignore=ignore_entries,
     )
     print(f"[OK] installed skill to: {dest}")
     print(f"[NEXT] use in Codex prompt: Use $openclaw-cortexnet-autopilot from {dest}")
@@ -5,33 +5,111 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import re
+import sys
 from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import AbstractSet, Any, Dict, List, Optional
 
+# EventLogger writes "event" right after "ts", so the first match is the record's own
+# event name rather than a key nested inside a logged kwarg.
+_EVENT_NAME_RE = re.compile(rb'"event"\s*:\s*"([^"\\]*)"')
 
-def load_jsonl(path: Path) -> List[Dict[str, Any]]:
+
+def load_jsonl(path: Path, events: Optional[AbstractSet[str]] = None) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
+    wanted = None if events is None else {name.encode("utf-8") for name in events}
     if not path.exists():
         return rows
-    for raw in path.read_text(encoding="utf-8").splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-        try:
-            obj = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(obj, dict):
-            rows.append(obj)
+    # Iterate the binary file so only one line is decoded at a time; json.loads takes bytes.
+    with path.open("rb", buffering=1 << 20) as f:
+        for raw in f:
+            line = raw.strip()
+            if not line:
+                continue
+            if wanted is not None:
+                # Lines with no plain event name (escapes, other writers) still get a full parse.
+                m = _EVENT_NAME_RE.search(line)
+                if m is not None and m.group(1) not in wanted:
+                    continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                # JSONDecodeError, or UnicodeDecodeError from a torn/garbled line.
+                continue
+            if isinstance(obj, dict):
+                rows.append(obj)
     return rows
 
 
+def tail_last_jsonl(path: Path, block_size: int = 1 << 16) -> Dict[str, Any]:
+    """Return the last JSON object in path, reading blocks backwards from the end.
+
+    Lines are skipped exactly as load_jsonl skips them, so the result matches
+    load_jsonl(path)[-1] without parsing the rest of the file.
+    """
+    try:
+        f = path.open("rb")
+    except FileNotFoundError:
+        return {}
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        carry = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + carry).split(b"\n")
+            # Until the start of the file is reached the first piece may be a partial line.
+            carry = lines.pop(0) if pos > 0 else b""
+            for raw in reversed(lines):
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(obj, dict):
+                    return obj
+    return {}
+
+
+def count_lines(path: Path, chunk_size: int = 1 << 20) -> int:
+    """Count lines in path without decoding it; a final line without a newline counts too."""
+    try:
+        f = path.open("rb")
+    except FileNotFoundError:
+        return 0
+    total = 0
+    last = b""
+    with f:
+        # bytes.count is a memchr scan in C; fixed-size reads keep memory flat.
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            total += chunk.count(b"\n")
+            last = chunk
+    if last and not last.endswith(b"\n"):
+        total += 1
+    return total
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Summarize OpenClaw autopilot logs")
     p.add_argument("--log-dir", default="./logs", help="Log directory")
     p.add_argument("--tail-rounds", type=int, default=5, help="How many latest rounds to print in text mode")
     p.add_argument("--json", action="store_true", help="Output JSON summary")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--latest",
+        action="store_true",
+        help="Only report the latest round and pause reason (reads the log tail, skips the counters)",
+    )
+    mode.add_argument(
+        "--count-only",
+        action="store_true",
+        help="Only report rounds_total, counted from line breaks without parsing (blank or torn lines count too)",
+    )
     return p.parse_args()
 
 
@@ -59,45 +137,98 @@ def build_recent_rounds(rows: List[Dict[str, Any]], tail: int) -> List[Dict[str,
     ]
 
 
+def format_latest_round(row: Dict[str, Any]) -> str:
+    return (
+        "- latest_round: "
+        f"status={row.get('status')} "
+        f"tool={row.get('tool_used')} "
+        f"commit={row.get('commit_status')} "
+        f"message={row.get('message')}"
+    )
+
+
+def paused_reason_lines(text: str) -> List[str]:
+    return ["- paused_reason:", *(f"  {line}" for line in text.splitlines())]
+
+
+def write_lines(lines: List[str]) -> None:
+    # One write for the whole report instead of a print() per line.
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def main_latest(log_dir: Path, as_json: bool) -> int:
+    latest_round = tail_last_jsonl(log_dir / "round_reports.jsonl")
+    pause_path = log_dir / "PAUSED_REASON.txt"
+    latest_pause = pause_path.read_text(encoding="utf-8").strip() if pause_path.exists() else ""
+    if as_json:
+        summary = {
+            "log_dir": str(log_dir),
+            "latest_round": latest_round,
+            "paused_reason_present": pause_path.exists(),
+            "paused_reason": latest_pause,
+        }
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return 0
+    out = ["OpenClaw Log Summary (latest)", f"- log_dir: {log_dir}"]
+    if latest_round:
+        out.append(format_latest_round(latest_round))
+    if latest_pause:
+        out.extend(paused_reason_lines(latest_pause))
+    write_lines(out)
+    return 0
+
+
+def main_count_only(log_dir: Path, as_json: bool) -> int:
+    # The runtime appends one JSON line per round, so line count == rounds_total
+    # unless the file holds blank or torn lines.
+    rounds_total = count_lines(log_dir / "round_reports.jsonl")
+    if as_json:
+        print(json.dumps({"log_dir": str(log_dir), "rounds_total": rounds_total}, ensure_ascii=False, indent=2))
+        return 0
+    write_lines(["OpenClaw Log Summary (count)", f"- log_dir: {log_dir}", f"- rounds_total: {rounds_total}"])
+    return 0
+
+
 def main() -> int:
     args = parse_args()
     log_dir = Path(args.log_dir).resolve()
+    if args.latest:
+        return main_latest(log_dir, args.json)
+    if args.count_only:
+        return main_count_only(log_dir, args.json)
     round_path = log_dir / "round_reports.jsonl"
     runner_path = log_dir / "openclaw_runner.log"
     pause_path = log_dir / "PAUSED_REASON.txt"
 
     rounds = load_jsonl(round_path)
-    events = load_jsonl(runner_path)
 
-    status_counter = Counter()
-    tool_counter = Counter()
-    commit_counter = Counter()
-    for row in rounds:
-        status_counter[str(row.get("status", "unknown"))] += 1
-        tool_counter[str(row.get("tool_used", "none"))] += 1
-        commit_counter[str(row.get("commit_status", "unknown"))] += 1
+    # Counter(iterable) counts in C; one generator per field beats three += per row.
+    status_counter = Counter(str(row.get("status", "unknown")) for row in rounds)
+    tool_counter = Counter(str(row.get("tool_used", "none")) for row in rounds)
+    commit_counter = Counter(str(row.get("commit_status", "unknown")) for row in rounds)
 
     gate_counter = Counter()
     cli_call_fail_reason_counter = Counter()
     cli_switch_reason_counter = Counter()
     cli_init_fail_reason_counter = Counter()
     timeout_reason_counter = Counter()
-    for ev in events:
-        if ev.get("event") == "audit.fail":
-            gate = str(ev.get("gate", "none"))
-            gate_counter[gate] += 1
-        if ev.get("event") == "cli.call_failed":
-            reason = str(ev.get("reason", "unknown"))
-            cli_call_fail_reason_counter[reason] += 1
-        if ev.get("event") == "cli.switch":
-            reason = str(ev.get("reason", "unknown"))
-            cli_switch_reason_counter[reason] += 1
-        if ev.get("event") == "cli.init.failed":
-            reason = str(ev.get("reason", "unknown"))
-            cli_init_fail_reason_counter[reason] += 1
-        if ev.get("event") == "cli.finish" and bool(ev.get("terminated", False)):
-            reason = str(ev.get("reason", "unknown"))
-            timeout_reason_counter[reason] += 1
+    # event -> (counter, field counted, default value, flag the event must carry)
+    handlers = {
+        "audit.fail": (gate_counter, "gate", "none", None),
+        "cli.call_failed": (cli_call_fail_reason_counter, "reason", "unknown", None),
+        "cli.switch": (cli_switch_reason_counter, "reason", "unknown", None),
+        "cli.init.failed": (cli_init_fail_reason_counter, "reason", "unknown", None),
+        "cli.finish": (timeout_reason_counter, "reason", "unknown", "terminated"),
+    }
+    for ev in load_jsonl(runner_path, events=handlers.keys()):
+        name = ev.get("event")
+        handler = handlers.get(name) if isinstance(name, str) else None
+        if handler is None:
+            continue
+        counter, field, default, flag = handler
+        if flag is not None and not ev.get(flag, False):
+            continue
+        counter[str(ev.get(field, default))] += 1
 
     latest_round = rounds[-1] if rounds else {}
     latest_pause = pause_path.read_text(encoding="utf-8").strip() if pause_path.exists() else ""
@@ -124,40 +255,35 @@ def main() -> int:
         print(json.dumps(summary, ensure_ascii=False, indent=2))
         return 0
 
-    print("OpenClaw Log Summary")
-    print(f"- log_dir: {summary['log_dir']}")
-    print(f"- rounds_total: {summary['rounds_total']}")
-    print(f"- status_counts: {summary['status_counts']}")
-    print(f"- tool_counts: {summary['tool_counts']}")
-    print(f"- commit_status_counts: {summary['commit_status_counts']}")
-    print(f"- audit_fail_gate_counts: {summary['audit_fail_gate_counts']}")
-    print(f"- cli_call_failed_reason_counts: {summary['cli_call_failed_reason_counts']}")
-    print(f"- cli_switch_reason_counts: {summary['cli_switch_reason_counts']}")
-    print(f"- cli_init_fail_reason_counts: {summary['cli_init_fail_reason_counts']}")
-    print(f"- terminated_reason_counts: {summary['terminated_reason_counts']}")
+    out = [
+        "OpenClaw Log Summary",
+        f"- log_dir: {summary['log_dir']}",
+        f"- rounds_total: {summary['rounds_total']}",
+        f"- status_counts: {summary['status_counts']}",
+        f"- tool_counts: {summary['tool_counts']}",
+        f"- commit_status_counts: {summary['commit_status_counts']}",
+        f"- audit_fail_gate_counts: {summary['audit_fail_gate_counts']}",
+        f"- cli_call_failed_reason_counts: {summary['cli_call_failed_reason_counts']}",
+        f"- cli_switch_reason_counts: {summary['cli_switch_reason_counts']}",
+        f"- cli_init_fail_reason_counts: {summary['cli_init_fail_reason_counts']}",
+        f"- terminated_reason_counts: {summary['terminated_reason_counts']}",
+    ]
     if latest_round:
-        print(
-            "- latest_round: "
-            f"status={latest_round.get('status')} "
-            f"tool={latest_round.get('tool_used')} "
-            f"commit={latest_round.get('commit_status')} "
-            f"message={latest_round.get('message')}"
-        )
+        out.append(format_latest_round(latest_round))
     if recent_rounds:
-        print(f"- recent_rounds(last={len(recent_rounds)}):")
-        for item in recent_rounds:
-            print(
-                "  "
-                f"#{item.get('round_id')} "
-                f"status={item.get('status')} "
-                f"tool={item.get('tool_used')} "
-                f"commit={item.get('commit_status')} "
-                f"msg={item.get('message')}"
-            )
+        out.append(f"- recent_rounds(last={len(recent_rounds)}):")
+        out.extend(
+            "  "
+            f"#{item.get('round_id')} "
+            f"status={item.get('status')} "
+            f"tool={item.get('tool_used')} "
+            f"commit={item.get('commit_status')} "
+            f"msg={item.get('message')}"
+            for item in recent_rounds
+        )
     if latest_pause:
-        print("- paused_reason:")
-        for line in latest_pause.splitlines():
-            print(f"  {line}")
+        out.extend(paused_reason_lines(latest_pause))
+    write_lines(out)
     return 0
 
 
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import argparse
 import os
+import re
 import shlex
 import subprocess
 from pathlib import Path
@@ -16,21 +17,20 @@ def repo_name_from_url(repo_url: str) -> str:
     return name[:-4] if name.endswith(".git") else name
 
 
+# One KEY=value assignment per line, as `source .env` in start_openclaw.sh reads it;
+# comments and lines that are not plain assignments never match.
+_ENV_LINE_RE = re.compile(r"^[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_]*)[ \t]*=(.*)$", re.MULTILINE)
+
+
 def parse_env_file(path: Path) -> Dict[str, str]:
-    env: Dict[str, str] = {}
     if not path.exists():
-        return env
-    for raw in path.read_text(encoding="utf-8").splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        k, v = line.split("=", 1)
-        env[k.strip()] = v.strip()
-    return env
+        return {}
+    text = path.read_text(encoding="utf-8")
+    return {m.group(1): m.group(2).strip() for m in _ENV_LINE_RE.finditer(text)}
 
 
 def run_cmd(cmd: list[str], cwd: Path | None = None, env: Dict[str, str] | None = None) -> int:
-    print("$", " ".join(shlex.quote(x) for x in cmd))
+    print("$", shlex.join(cmd))
     proc = subprocess.run(cmd, cwd=str(cwd) if cwd else None, env=env)
     return proc.returncode
 
@@ -103,6 +103,7 @@ def main() -> int:
         return code
 
     env_file = output_dir / ".env"
+    config_path = str(output_dir / "openclaw_config.json")
     if args.token:
         payload = f"{args.token_env}={args.token}\n"
         env_file.write_text(payload, encoding="utf-8")
@@ -110,15 +111,17 @@ def main() -> int:
     elif not env_file.exists():
         print(f"[setup] no token written; create {env_file} and set {args.token_env}=<token>")
 
-    run_env = os.environ.copy()
-    run_env.update(parse_env_file(env_file))
+    # Only the doctor and --once children need the .env values on top of our environment.
+    run_env: Dict[str, str] = {}
+    if args.run_doctor or args.run_once:
+        run_env = {**os.environ, **parse_env_file(env_file)}
 
     if args.run_doctor:
         doctor_cmd = [
             "python3",
             str(output_dir / "doctor_autopilot.py"),
             "--config",
-            str(output_dir / "openclaw_config.json"),
+            config_path,
         ]
         if args.token_env in run_env and run_env.get(args.token_env):
             doctor_cmd.append("--check-github-token")
@@ -131,7 +134,7 @@ def main() -> int:
             "python3",
             str(output_dir / "openclaw_autopilot.py"),
             "--config",
-            str(output_dir / "openclaw_config.json"),
+            config_path,
             "--token-env",
             args.token_env,
             "--once",
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import importlib.util
 import json
 import shlex
 import subprocess
@@ -12,18 +13,20 @@ from pathlib import Path
 from typing import Any, Dict
 
 
-def run_cmd(cmd: list[str], cwd: Path | None = None, allow_failure: bool = False) -> tuple[int, str]:
-    print("$", " ".join(shlex.quote(x) for x in cmd))
+def run_cmd(cmd: list[str], cwd: Path | None = None, allow_failure: bool = False) -> tuple[int, bytes]:
+    print("$", shlex.join(cmd))
+    # Keep the output as bytes: json.loads takes them directly, and only the failure
+    # message needs text.
     proc = subprocess.run(
         cmd,
         cwd=str(cwd) if cwd else None,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        text=True,
     )
-    out = proc.stdout or ""
+    out = proc.stdout or b""
     if proc.returncode != 0 and not allow_failure:
-        raise RuntimeError(f"command failed ({proc.returncode}): {' '.join(cmd)}\n{out}")
+        text = out.decode("utf-8", errors="replace")
+        raise RuntimeError(f"command failed ({proc.returncode}): {' '.join(cmd)}\n{text}")
     return proc.returncode, out
 
 
@@ -36,6 +39,39 @@ def assert_true(condition: bool, message: str) -> None:
         raise AssertionError(message)
 
 
+def check_runtime_file_writes(runtime_script: Path, root: Path) -> None:
+    # Prompt and pause files share the runtime's directory cache, so write both in one process.
+    spec = importlib.util.spec_from_file_location("openclaw_autopilot_smoke", runtime_script)
+    assert_true(spec is not None and spec.loader is not None, "cannot load runtime module")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+        repo_dir = root / "repo"
+        log_dir = root / "logs"
+        prompt = module.write_prompt_file(repo_dir, ".openclaw/prompt.md", "smoke prompt")
+        assert_true(prompt.read_text(encoding="utf-8") == "smoke prompt", "prompt file content mismatch")
+        result = module.RoundResult(
+            status="paused",
+            round_id=1,
+            tool_used=None,
+            audit_result=None,
+            commit_status="not_started",
+            commit_hash=None,
+            message="smoke pause",
+        )
+        module.write_pause_reason_file(log_dir, result)
+        pause_text = (log_dir / "PAUSED_REASON.txt").read_text(encoding="utf-8")
+        assert_true("message: smoke pause" in pause_text, "pause reason file content mismatch")
+        # A removed .openclaw/ (git clean -fd) must be recreated on the next write.
+        prompt.unlink()
+        prompt.parent.rmdir()
+        prompt = module.write_prompt_file(repo_dir, ".openclaw/prompt.md", "smoke prompt 2")
+        assert_true(prompt.read_text(encoding="utf-8") == "smoke prompt 2", "prompt file not rewritten after dir removal")
+    finally:
+        sys.modules.pop(spec.name, None)
+
+
 def main() -> int:
     script_dir = Path(__file__).resolve().parent
     skill_dir = script_dir.parent
@@ -110,6 +146,7 @@ def main() -> int:
         assert_true("ok" in doctor_json and "items" in doctor_json, "doctor json schema mismatch")
 
         run_cmd([sys.executable, str(workspace / "openclaw_autopilot.py"), "--help"], cwd=workspace)
+        check_runtime_file_writes(workspace / "openclaw_autopilot.py", Path(tmp) / "runtime_io")
 
         _, summary_out = run_cmd(
             [